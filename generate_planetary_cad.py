@@ -5,6 +5,7 @@ import math # For trigonometric functions
 
 # Import the classes for single-stage planetary gears
 from pygeartrain.planetary import Planetary, PlanetaryGeometry
+from pygeartrain.core.extrusion import extrude, mesh, rim, write_stl
 
 # --- User Defined Parameters ---
 TARGET_RING_DIAMETER_MM = 70.0   # Desired outer diameter for the ring gear in mm
@@ -13,7 +14,8 @@ HELIX_ANGLE_DEGREES = 20.0     # Helix angle for one half of the herringbone/hel
 GEAR_TYPE = 'herringbone'        # Choose 'helix' or 'herringbone'
 CARRIER_PATH_POINTS = 200      # Number of points for the carrier path circle
 CLOSE_POINT_TOLERANCE = 1e-7     # Tolerance for removing duplicate/close points
-SMALL_RADIUS_TOLERANCE = 1e-9  # Avoid division by zero for points near origin
+STL_SLICES = 41                # Number of Z slices in the exported STL meshes
+RING_WALL_MM = 3.0             # Radial wall thickness outside the ring gear teeth in the STL mesh
 
 # --- Parameters derived from the "Blue" Stage (Stage 2) ---
 R_teeth = 30
@@ -79,35 +81,6 @@ helix_angle_rad = math.radians(HELIX_ANGLE_DEGREES)
 # Use tangent for calculations
 base_tan_helix_angle = math.tan(helix_angle_rad)
 
-# --- Function to apply RIGID twist and return 3D points (Updated Logic) ---
-def apply_rigid_twist(xy_points, z_offset, tan_helix_for_gear, is_herringbone, scaled_reference_radius):
-    """Applies a RIGID rotation based on the twist at a reference radius."""
-    rotated_points_3d = []
-
-    # Determine the effective Z for twist direction calculation
-    z_for_twist_calc = z_offset
-    if is_herringbone:
-        z_for_twist_calc = abs(z_offset)
-
-    # Calculate the single twist angle based on the reference radius
-    if abs(z_offset) < SMALL_RADIUS_TOLERANCE or abs(tan_helix_for_gear) < 1e-12 or scaled_reference_radius < SMALL_RADIUS_TOLERANCE:
-        # No twist if z=0, helix=0, or reference radius is too small
-        twist_angle = 0.0
-    else:
-        twist_angle = (z_for_twist_calc * tan_helix_for_gear) / scaled_reference_radius
-
-    # Pre-calculate sin and cos for this single angle
-    cos_twist = math.cos(twist_angle)
-    sin_twist = math.sin(twist_angle)
-
-    # Apply the same rotation to all points
-    for x, y in xy_points:
-        x_new = x * cos_twist - y * sin_twist
-        y_new = x * sin_twist + y * cos_twist
-        rotated_points_3d.append([x_new, y_new, z_offset]) # Use original z_offset
-
-    return np.array(rotated_points_3d)
-
 # --- Function to filter, ensure closure, and save ---
 def save_curve_to_file(points_3d, filepath):
     """Saves 3D points to a text file for SolidWorks."""
@@ -123,72 +96,57 @@ def save_curve_to_file(points_3d, filepath):
     np.savetxt(filepath, points_3d, fmt='%.8f', delimiter=' ')
     print(f"Exported curve ({len(points_3d)} points) to: {filepath}")
 
-# --- Function to process and save profiles for one gear (Updated to use rigid twist) ---
-def save_gear_profiles(profile, gear_name, tooth_count, scale_factor, thickness, base_tan_helix, gear_type):
-    """Generates and saves the three RIGIDLY ROTATED curves for a gear."""
-    if profile is None or len(profile.vertices) < 3:
-        print(f"Warning: Not enough base vertices for {gear_name}. Skipping export.")
-        return
+# --- Twisted slices of all members at once ---
+# Twists follow the kinematics relative to the carrier, which keeps every mesh conjugate at each height;
+# the helix angle is attained at the outer radius of the sun, and the other hands follow from the meshes
+z_levels = {'z0': 0.0, 'z_pos': GEAR_THICKNESS_MM / 2.0, 'z_neg': -GEAR_THICKNESS_MM / 2.0}
+sun_index = N_planets + 1
+slices = extrude(
+    gear,
+    np.array(list(z_levels.values())) / scale_factor,
+    base_tan_helix_angle,
+    carrier='c',
+    reference=sun_index,
+    herringbone=GEAR_TYPE.lower() == 'herringbone',
+    centered=True,
+    tolerance=CLOSE_POINT_TOLERANCE,
+)
 
-    print(f"\nProcessing {gear_name} ({tooth_count} teeth) as {gear_type} (Rigid Rotation)...") # Indicate rigid rotation
-
-    # Determine Helix Hand/Direction
-    if gear_name == 'sun':
-        tan_helix_for_gear = base_tan_helix
-    else: # planet or ring
-        tan_helix_for_gear = -base_tan_helix
-    is_herringbone_flag = (gear_type.lower() == 'herringbone')
-    print(f"  - Using tan(helix) for gear: {tan_helix_for_gear:.4f}")
-
-    # Scale the base profile
-    vertices_2d_scaled = profile.vertices * scale_factor
-
-    # --- Calculate the reference radius for THIS gear's scaled profile ---
-    # Using the maximum radius of the scaled profile points
-    radii_scaled = np.linalg.norm(vertices_2d_scaled, axis=1)
-    scaled_max_radius_for_gear = np.max(radii_scaled)
-    print(f"  - Scaled Max Radius (Reference for Twist): {scaled_max_radius_for_gear:.4f}")
-
-    # Filter consecutive close points *on the scaled 2D profile*
-    filtered_points_2d = [vertices_2d_scaled[0]]
-    for i in range(len(vertices_2d_scaled) - 1):
-        point_current = filtered_points_2d[-1]
-        point_next = vertices_2d_scaled[i+1]
-        distance = np.linalg.norm(point_next - point_current)
-        if distance > CLOSE_POINT_TOLERANCE * scale_factor:
-            filtered_points_2d.append(point_next)
-    filtered_points_2d = np.array(filtered_points_2d)
-    print(f"  Base points: {len(profile.vertices)}, Scaled points: {len(vertices_2d_scaled)}, Filtered 2D points: {len(filtered_points_2d)}")
-    if len(filtered_points_2d) < 3:
-         print(f"Warning: Not enough vertices after filtering for {gear_name}. Skipping export.")
-         return
-
-    # Define Z offsets
-    z0 = 0.0
-    z_pos = thickness / 2.0
-    z_neg = -thickness / 2.0
-
-    # Generate points for each Z level using the RIGID rotation logic
-    points_z0 = apply_rigid_twist(filtered_points_2d, z0, tan_helix_for_gear, is_herringbone_flag, scaled_max_radius_for_gear)
-    points_z_pos = apply_rigid_twist(filtered_points_2d, z_pos, tan_helix_for_gear, is_herringbone_flag, scaled_max_radius_for_gear)
-    points_z_neg = apply_rigid_twist(filtered_points_2d, z_neg, tan_helix_for_gear, is_herringbone_flag, scaled_max_radius_for_gear)
-
-    # Define filenames
-    base_filename = f"{gear_name}_{tooth_count}"
-    filepath_z0 = os.path.join(output_dir, f"{base_filename}_z0.txt")
-    filepath_z_pos = os.path.join(output_dir, f"{base_filename}_z_pos.txt")
-    filepath_z_neg = os.path.join(output_dir, f"{base_filename}_z_neg.txt")
-
-    # Save each curve, ensuring closure
-    save_curve_to_file(points_z0, filepath_z0)       # save_curve_to_file remains the same
-    save_curve_to_file(points_z_pos, filepath_z_pos)
-    save_curve_to_file(points_z_neg, filepath_z_neg)
+def save_gear_profiles(member_slices, gear_name, tooth_count):
+    """Saves the twisted curves of a gear at each Z level."""
+    print(f"\nProcessing {gear_name} ({tooth_count} teeth) as {GEAR_TYPE}...")
+    if member_slices is None or member_slices.vertices.shape[1] < 3:
+        print(f"Warning: Not enough vertices for {gear_name}. Skipping export.")
+        return
+    for name, points_3d in zip(z_levels, member_slices.vertices * scale_factor):
+        save_curve_to_file(points_3d, os.path.join(output_dir, f"{gear_name}_{tooth_count}_{name}.txt"))
 
 # --- Save Gear Profiles ---
 print(f"\nExporting {GEAR_TYPE} gear profiles...")
-save_gear_profiles(base_ring_profile, "ring", R_teeth, scale_factor, GEAR_THICKNESS_MM, base_tan_helix_angle, GEAR_TYPE)
-save_gear_profiles(base_planet_profile, "planet", P_teeth, scale_factor, GEAR_THICKNESS_MM, base_tan_helix_angle, GEAR_TYPE)
-save_gear_profiles(base_sun_profile, "sun", S_teeth, scale_factor, GEAR_THICKNESS_MM, base_tan_helix_angle, GEAR_TYPE)
+save_gear_profiles(slices[0], "ring", R_teeth)
+save_gear_profiles(slices[1], "planet", P_teeth)
+save_gear_profiles(slices[sun_index], "sun", S_teeth)
+
+
+# --- Save Watertight Meshes ---
+# Meshes need slices at monotonic heights; the ring gets a circular outer wall to close its material
+print(f"\nExporting {GEAR_TYPE} gear meshes...")
+stacks = extrude(
+    gear,
+    np.linspace(-GEAR_THICKNESS_MM / 2.0, GEAR_THICKNESS_MM / 2.0, STL_SLICES) / scale_factor,
+    base_tan_helix_angle,
+    carrier='c',
+    reference=sun_index,
+    herringbone=GEAR_TYPE.lower() == 'herringbone',
+    centered=True,
+    tolerance=CLOSE_POINT_TOLERANCE,
+)
+stacks[0] = rim(stacks[0], (target_radius + RING_WALL_MM) / scale_factor)
+for stack, gear_name, tooth_count in [(stacks[0], "ring", R_teeth), (stacks[1], "planet", P_teeth), (stacks[sun_index], "sun", S_teeth)]:
+    vertices, faces = mesh(stack)
+    stl_filepath = os.path.join(output_dir, f"{gear_name}_{tooth_count}.stl")
+    write_stl(stl_filepath, [(vertices * scale_factor, faces)])
+    print(f"Exported mesh ({len(faces)} triangles) to: {stl_filepath}")
 
 
 # --- Generate and Save Carrier Path (Planet Center Circle) ---
@@ -0,0 +1,600 @@
+"""Contact analysis of arranged geartrains over phase sweeps
+
+Every member is treated as a rigid body. Its motion over a sweep is recovered from a sparse
+subsample of its profile, so only the members of a pair are ever transformed in full;
+and then only into the body frame of the other member of the pair,
+where a static spatial index of its boundary answers signed distance queries.
+"""
+import copy
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+from pygeartrain.core.geometry import GearGeometry, flatten
+from pygeartrain.core.pga import rigid_inverse, rigid_matrices, transform_batch
+from pygeartrain.core.profiles import Profile
+
+
+def _subsample(profiles, samples):
+    """Replace every profile in a nested structure of generated profiles by a few of its vertices"""
+    if isinstance(profiles, Profile):
+        n = len(profiles.vertices)
+        return Profile(profiles.vertices[np.unique(np.linspace(0, n - 1, min(n, samples)).astype(int))])
+    if isinstance(profiles, (list, tuple)):
+        return type(profiles)(_subsample(p, samples) for p in profiles)
+    return profiles
+
+
+def _rigid_fit(x, y):
+    """Least squares rigid motions from the points x [n, 2] onto y [..., n, 2], as point transformation matrices
+    [..., 3, 3]; rotation between the centered point sets, exact for rigid motions"""
+    cx, cy = x.mean(axis=0), y.mean(axis=-2)
+    h = np.einsum('ni,...nj->...ij', x - cx, y - cy[..., None, :])
+    angle = np.arctan2(h[..., 0, 1] - h[..., 1, 0], h[..., 0, 0] + h[..., 1, 1])
+    c, s = np.cos(angle), np.sin(angle)
+    t = cy - np.stack([c * cx[0] - s * cx[1], s * cx[0] + c * cx[1]], axis=-1)
+    return rigid_matrices(angle, t[..., 0], t[..., 1])
+
+
+def member_motions(geometry: GearGeometry, phases, samples=8):
+    """Rigid motion of each member of the flattened arrangement, relative to its pose at phase 0
+
+    Parameters
+    ----------
+    phases: ndarray, [T]
+    samples: int
+        number of vertices per profile used to track its motion
+
+    Returns
+    -------
+    List[ndarray, [T, 3, 3]]
+        point transformation matrices, as used by `transform_batch`; None for empty members
+    """
+    probe = copy.copy(geometry)
+    probe.__dict__['generate_profiles'] = _subsample(geometry.generate_profiles, samples)
+    reference = flatten(probe.arrange(0.0))
+    motions = []
+    for x, y in zip(reference, probe.arrange_sweep(phases)):
+        x = x.vertices
+        motions.append(None if len(x) < 2 else _rigid_fit(x, y))
+    return motions
+
+
+def _inside(points, loop):
+    """Even-odd test of points [n, 2] against a closed loop [m, 2]"""
+    a, b = loop, np.roll(loop, -1, axis=0)
+    px, py = points[:, None, 0], points[:, None, 1]
+    crosses = (a[:, 1] > py) != (b[:, 1] > py)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = a[:, 0] + (py - a[:, 1]) * (b[:, 0] - a[:, 0]) / (b[:, 1] - a[:, 1])
+    return (np.count_nonzero(crosses & (px < x), axis=1) % 2) == 1
+
+
+def _sides(loops, internal=False):
+    """Sign for each loop, turning the right hand normals of its edges out of the material
+
+    Loops nested an even number of times bound material on their inside; holes on their outside.
+    Internal profiles, such as ring gears, have their material outside of their outer loops.
+    """
+    signs = []
+    for loop in loops:
+        depth = sum(_inside(loop[:1], o)[0] for o in loops if o is not loop)
+        b = np.roll(loop, -1, axis=0)
+        # right hand normals point out of a counter clockwise loop
+        ccw = np.sign(np.sum(loop[:, 0] * b[:, 1] - b[:, 0] * loop[:, 1]))
+        signs.append(-ccw if (depth % 2 == 1) != internal else ccw)
+    return signs
+
+
+def vertex_normals(profile: Profile, internal=False):
+    """Unit normals at the vertices of a profile [V, 2], pointing out of its material"""
+    normals = np.zeros(profile.vertices.shape)
+    loops = profile.loops
+    closed = [i for i, l in enumerate(loops) if len(l) > 1]
+    for i, sign in zip(closed, _sides([loops[i] for i in closed], internal)):
+        loop = loops[i]
+        d = np.roll(loop, -1, axis=0) - loop
+        edge = np.stack([d[:, 1], -d[:, 0]], axis=1) * sign
+        edge /= np.maximum(np.linalg.norm(edge, axis=1, keepdims=True), 1e-300)
+        n = edge + np.roll(edge, 1, axis=0)
+        normals[profile.offsets[i]:profile.offsets[i + 1]] = n / np.maximum(np.linalg.norm(n, axis=1, keepdims=True), 1e-300)
+    return normals
+
+
+class SignedDistance:
+    """Signed distance to the boundary of a profile, positive outside of its material"""
+
+    cells = 6   # grid cells per cutoff, of the grids of `estimate`
+
+    def __init__(self, profile: Profile, internal=False, spacing=None):
+        from scipy.spatial import cKDTree
+        loops = [l for l in profile.loops if len(l) > 1]
+        starts, ends, normals = [], [], []
+        for loop, sign in zip(loops, _sides(loops, internal)):
+            a, b = loop, np.roll(loop, -1, axis=0)
+            keep = np.linalg.norm(b - a, axis=1) > 1e-12
+            a, b = a[keep], b[keep]
+            starts.append(a)
+            ends.append(b)
+            normals.append(np.stack([b[:, 1] - a[:, 1], a[:, 0] - b[:, 0]], axis=1) * sign)
+        a, b, n = [np.concatenate(x) for x in (starts, ends, normals)]
+        n /= np.linalg.norm(n, axis=1, keepdims=True)
+        sizes = [len(x) for x in starts]
+        offsets = np.repeat(np.cumsum([0] + sizes[:-1]), sizes)
+        local = np.arange(len(a)) - offsets
+        count = np.repeat(sizes, sizes)
+        self.next = offsets + (local + 1) % count
+        self.prev = offsets + (local - 1) % count
+        self.a, self.d, self.normal = a, b - a, n
+        self.length2 = np.einsum('ni,ni->n', self.d, self.d)
+        # vertex pseudo-normals, for points nearest to a segment endpoint
+        self.vertex_normal = n + n[self.prev]
+        self.vertex_normal /= np.linalg.norm(self.vertex_normal, axis=1, keepdims=True)
+
+        # densify long segments, so that the nearest indexed point lies on or next to the nearest segment
+        length = np.linalg.norm(self.d, axis=1)
+        spacing = np.median(length) if spacing is None else spacing
+        pieces = np.maximum(1, np.ceil(length / spacing).astype(int))
+        self.segment = np.repeat(np.arange(len(a)), pieces)
+        f = np.arange(len(self.segment)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+        points = a[self.segment] + self.d[self.segment] * (f / pieces[self.segment])[:, None]
+        self.tree = cKDTree(points)
+        self.center = a.mean(axis=0)
+        radius = np.linalg.norm(a - self.center, axis=1)
+        self.r_min, self.r_max = radius.min(), radius.max()
+        self.internal = internal
+        self.lower, self.upper = a.min(axis=0), a.max(axis=0)
+        self.grids = {}
+
+    def __call__(self, points):
+        """Signed distance of points [n, 2]"""
+        return self._closest(points)[0]
+
+    def _closest(self, points):
+        """Signed distance of points [n, 2], their offsets from the nearest boundary points [n, 2],
+        and the normals there [n, 2]"""
+        _, i = self.tree.query(points)
+        s = self.segment[i]
+        # the nearest segment is the one of the nearest indexed point, or one of its neighbours
+        candidates = np.stack([self.prev[s], s, self.next[s]], axis=1)
+        rx, ry = points[:, 0, None] - self.a[candidates, 0], points[:, 1, None] - self.a[candidates, 1]
+        dx, dy = self.d[candidates, 0], self.d[candidates, 1]
+        t = np.clip((rx * dx + ry * dy) / self.length2[candidates], 0, 1)
+        rx -= t * dx
+        ry -= t * dy
+        k = np.argmin(rx * rx + ry * ry, axis=1)[:, None]
+        best = np.take_along_axis(candidates, k, axis=1)[:, 0]
+        tb = np.take_along_axis(t, k, axis=1)[:, 0]
+        delta = np.stack([np.take_along_axis(rx, k, axis=1)[:, 0], np.take_along_axis(ry, k, axis=1)[:, 0]], axis=1)
+        normal = self.normal[best]
+        normal[tb <= 0] = self.vertex_normal[best[tb <= 0]]
+        normal[tb >= 1] = self.vertex_normal[self.next[best[tb >= 1]]]
+        sign = np.where(np.einsum('ni,ni->n', delta, normal) < 0, -1.0, 1.0)
+        return sign * np.sqrt(np.einsum('ni,ni->n', delta, delta)), delta, normal
+
+    def query(self, points):
+        """Signed distance of points [n, 2], and its gradient [n, 2]"""
+        d, delta, normal = self._closest(points)
+        dist = np.abs(d)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gradient = np.where((dist > 1e-12)[:, None], delta * (np.sign(d) / dist)[:, None], normal)
+        return d, gradient
+
+    def grid(self, cell, margin):
+        """Bilinear interpolation of the signed distance over a grid of square cells,
+        covering the boundary with a margin; and a bound on its error within each cell
+
+        Only nodes within margin + cell of the boundary are evaluated exactly. Cells with any node beyond that
+        lie further than margin - cell from the boundary throughout, and hold that as a lower bound outside
+        of the material, or -inf inside of it; with zero error
+
+        Returns
+        -------
+        origin: ndarray, [2]
+        table: ndarray, [I, J, 5]
+            for each cell, coefficients c of c0 + c1 x + c2 y + c3 x y in local coordinates in [0, 1),
+            and the error bound
+        """
+        key = cell, margin
+        if key not in self.grids:
+            origin = self.lower - margin
+            shape = tuple(np.ceil((self.upper + margin - origin) / cell).astype(int) + 1)
+            reach = margin + cell
+            # the distance at every fourth node bounds that of the nodes around it; only those which may lie
+            # within reach of the boundary are evaluated, the others just take the side of their coarse node
+            step = 4
+            coarse_shape = tuple((n - 1) // step + 1 for n in shape)
+            coarse = self(origin + np.stack(np.indices(coarse_shape), axis=-1).reshape(-1, 2) * step * cell)
+            ci, cj = (np.minimum(np.rint(np.arange(n) / step).astype(int), c - 1) for n, c in zip(shape, coarse_shape))
+            side = coarse.reshape(coarse_shape)[ci[:, None], cj]
+            offset = np.hypot(np.arange(shape[0]) - ci * step, (np.arange(shape[1]) - cj * step)[:, None]).T * cell
+            near = np.abs(side) - offset <= reach
+            nodes, gradient = np.where(side > 0, reach, -reach), np.zeros(shape + (2,))
+            nodes[near], gradient[near] = self.query(origin + np.argwhere(near) * cell)
+            outside = nodes > 0
+
+            n00, n10, n01, n11 = nodes[:-1, :-1], nodes[1:, :-1], nodes[:-1, 1:], nodes[1:, 1:]
+            # the error of interpolating a 1-Lipschitz function is at most the cell half diagonal,
+            # times the variation of its gradient over the cell; estimated from the spread of the gradients
+            # at the cell corners, with a fourfold margin, and capped by the Lipschitz bound itself
+            g = np.stack([gradient[:-1, :-1], gradient[1:, :-1], gradient[:-1, 1:], gradient[1:, 1:]])
+            spread = np.linalg.norm(g - g.mean(axis=0), axis=-1).max(axis=0)
+            error = cell * np.sqrt(0.5) * np.minimum(1, 4 * spread) + 1e-12 * cell
+            table = np.stack([n00, n10 - n00, n01 - n00, n11 - n10 - n01 + n00, error], axis=-1)
+            beyond = ~(near[:-1, :-1] & near[1:, :-1] & near[:-1, 1:] & near[1:, 1:])
+            table[beyond] = 0
+            table[beyond, 0] = np.where(outside[:-1, :-1][beyond], margin - cell, -np.inf)
+            self.grids[key] = origin, table
+        return self.grids[key]
+
+    def estimate(self, points, cutoff):
+        """Signed distance of points [n, 2], bilinearly interpolated from a grid with `cells` cells per cutoff,
+        and a bound on its error [n]
+
+        Beyond the grid, which extends further than cutoff + cell from the boundary, that is returned as a lower bound
+        outside of the material, or -inf inside of it; with zero error
+        """
+        cell = cutoff / self.cells
+        origin, table = self.grid(cell, cutoff + 2 * cell)
+        x = (points - origin) / cell
+        index = np.floor(x)
+        x -= index
+        index = index.astype(int)
+        inside = np.all((index >= 0) & (index < table.shape[:2]), axis=1)
+        c = table[np.where(inside, index[:, 0], 0), np.where(inside, index[:, 1], 0)]
+        d = c[:, 0] + c[:, 1] * x[:, 0] + (c[:, 2] + c[:, 3] * x[:, 0]) * x[:, 1]
+        d[~inside] = -np.inf if self.internal else cutoff + cell
+        c[~inside, 4] = 0
+        return d, c[:, 4]
+
+    def near(self, r2, cutoff):
+        """Mask of squared distances to `center` for which the boundary may be within cutoff;
+        beyond that, the whole boundary lies within an annulus, and points on its open side are clear"""
+        if self.internal:
+            return r2 > np.maximum(0.0, self.r_min - cutoff) ** 2
+        return r2 < (self.r_max + cutoff) ** 2
+
+
+def _transform(p, v, m, t):
+    """Vertices p[v] transformed by m[t], [K, 2]"""
+    x, y = p[v, 0], p[v, 1]
+    q = np.empty((len(t), 2))
+    q[:, 0] = x * m[t, 1, 1] + y * m[t, 2, 1] + m[t, 0, 1]
+    q[:, 1] = x * m[t, 1, 2] + y * m[t, 2, 2] + m[t, 0, 2]
+    return q
+
+
+def _group_min(g, values):
+    """Smallest of values over runs of equal group index g, repeated for each element"""
+    first = np.flatnonzero(np.diff(g, prepend=-1))
+    return np.repeat(np.minimum.reduceat(values, first), np.diff(np.append(first, len(g))))
+
+
+def _near(p, f, m, cutoff, max_bytes):
+    """Vertex-phase pairs of vertices p [V, 2] which may be within cutoff of the boundary of f,
+    under point transformations m [T, 3, 3] into the frame of f
+
+    Yields
+    ------
+    t, v: ndarray, [K]
+        phase and vertex indices, in phase-major order
+    q: ndarray, [K, 2]
+        transformed vertices
+    d, e: ndarray, [K]
+        their estimated signed distance to the boundary of f, and its error bound, as by `SignedDistance.estimate`
+    """
+    # the bounding annulus of f in the frame of p, to select the vertices that may be near
+    c = transform_batch(rigid_inverse(m), f.center[None])[:, 0]
+    p2 = np.einsum('vi,vi->v', p, p)
+    chunk = max(1, max_bytes // max(1, 8 * len(p)))
+    for start in range(0, len(m), chunk):
+        s = slice(start, start + chunk)
+        r2 = p2 - 2 * c[s] @ p.T + np.einsum('ti,ti->t', c[s], c[s])[:, None]
+        t, v = np.nonzero(f.near(r2, cutoff))
+        if len(t):
+            q = _transform(p, v, m[s], t)
+            d, e = f.estimate(q, cutoff)
+            keep = d - e < cutoff
+            if np.any(keep):
+                yield start + t[keep], v[keep], q[keep], d[keep], e[keep]
+
+
+def _nearest(p, f, m, cutoff, max_bytes, window=8):
+    """Vertex-phase pairs of vertices p [V, 2] which may attain the smallest signed distance to the boundary of f
+    at their phase, if within cutoff; under point transformations m [T, 3, 3] into the frame of f
+
+    Vertices are culled per window of consecutive phases first; at its middle phase,
+    with their distance bounds widened by how far they move within the window.
+    Yields as `_near`
+    """
+    T = len(m)
+    starts = np.arange(0, T, window)
+    middle = np.minimum(starts + window // 2, T - 1)
+    # displacement of the vertices within the window of each phase, as r a + b, with r their distance to o
+    o = p.mean(axis=0)
+    w = np.arange(T) // window
+    R = m[:, 1:, 1:]
+    a = np.linalg.norm(R - R[middle][w], axis=(1, 2)) / np.sqrt(2)
+    moved = o @ R + m[:, 0, 1:]
+    b = np.linalg.norm(moved - moved[middle][w], axis=1)
+    a, b = np.maximum.reduceat(a, starts), np.maximum.reduceat(b, starts)
+    r = np.linalg.norm(p - o, axis=1)
+
+    c = transform_batch(rigid_inverse(m[middle]), f.center[None])[:, 0]
+    p2 = np.einsum('vi,vi->v', p, p)
+    chunk = max(1, max_bytes // max(1, 16 * len(p)))
+    for start in range(0, len(starts), chunk):
+        s = slice(start, start + chunk)
+        radius = r * a[s, None] + b[s, None]
+        r2 = p2 - 2 * c[s] @ p.T + np.einsum('ti,ti->t', c[s], c[s])[:, None]
+        k, v = np.nonzero(f.near(r2, cutoff + radius))
+        if not len(k):
+            continue
+        d, e = f.estimate(_transform(p, v, m[middle[s]], k), cutoff)
+        radius = radius[k, v]
+        upper = np.where(np.isfinite(d), d + e + radius, np.inf)
+        keep = d - e - radius <= np.minimum(_group_min(k, upper), cutoff)
+        k, v = start + k[keep], v[keep]
+
+        # the survivors at every phase of their window, in phase-major order
+        counts = np.minimum(starts[k] + window, T) - starts[k]
+        i = np.repeat(np.arange(len(k)), counts)
+        t = starts[k][i] + np.arange(len(i)) - np.repeat(np.cumsum(counts) - counts, counts)
+        order = np.argsort(t, kind='stable')
+        t, v = t[order], v[i[order]]
+        q = _transform(p, v, m, t)
+        d, e = f.estimate(q, cutoff)
+        keep = d - e < cutoff
+        if np.any(keep):
+            yield t[keep], v[keep], q[keep], d[keep], e[keep]
+
+
+def _reduce(t, values, out, ufunc):
+    """Reduce values into out, over runs of equal phase index t"""
+    first = np.flatnonzero(np.diff(t, prepend=-1))
+    out[t[first]] = ufunc(out[t[first]], ufunc.reduceat(values, first))
+
+
+class _Contacts:
+    """Members of an arrangement, their motions over a sweep, and the signed distance fields of their boundaries"""
+
+    def __init__(self, geometry, phases, cutoff=None, max_bytes=64 * 2**20, members=None):
+        self.geometry = geometry
+        self.phases = np.atleast_1d(np.asarray(phases, dtype=float))
+        self.members = flatten(geometry.arrange(0.0)) if members is None else members
+        self.cutoff = 0.05 * geometry.limit if cutoff is None else cutoff
+        self.max_bytes = max_bytes
+        self.fields = {}
+
+    def field(self, i):
+        """Signed distance field of the boundary of member i, and the transformation [3, 3] from the frame of i
+        to that of the field, or None; congruent members, such as the planets of a planetary, share a single field"""
+        if i not in self.fields:
+            self.fields[i] = self._congruent(i) or (SignedDistance(self.members[i], internal=i in self.geometry.internal), None)
+        return self.fields[i]
+
+    def _congruent(self, i):
+        a, internal = self.members[i], i in self.geometry.internal
+        for j, (f, c) in self.fields.items():
+            b = self.members[j]
+            if c is not None or (j in self.geometry.internal) != internal or len(b.vertices) != len(a.vertices):
+                continue
+            if len(a.vertices) < 2 or not np.array_equal(a.offsets, b.offsets):
+                continue
+            m = _rigid_fit(a.vertices, b.vertices)
+            if np.abs(transform_batch(m, a.vertices) - b.vertices).max() <= 1e-12 * self.geometry.limit:
+                return f, m
+
+    def gap(self, i, m, j):
+        """Smallest signed distance of the vertices of i to the boundary of j, for each phase,
+        given transformations m [T, 3, 3] from the frame of i to that of j"""
+        out = np.full(len(m), np.inf)
+        f, c = self.field(j)
+        m = m if c is None else m @ c
+        for t, v, q, d, e in _nearest(self.members[i].vertices, f, m, self.cutoff, self.max_bytes):
+            # only vertices which may attain the smallest gap of their phase are resolved exactly
+            bound = _group_min(t, np.where(np.isfinite(d), d + e, np.inf))
+            r = d - e <= np.minimum(bound, self.cutoff)
+            exact = np.full(len(t), np.inf)
+            exact[r] = f(q[r])
+            # the error bounds are estimates; where the exact gap exceeds its bound, resolve all vertices up to it
+            more = ~r & (d - e <= np.minimum(_group_min(t, exact), self.cutoff))
+            exact[more] = f(q[more])
+            r |= more
+            _reduce(t[r], exact[r], out, np.minimum)
+        return out
+
+    def roots(self, i, m, dm, j):
+        """Linearized contact of the vertices of i with the boundary of j, for each phase,
+        given transformations m [T, 3, 3] from the frame of i to that of j, and their derivatives dm
+
+        Returns
+        -------
+        forward, reverse: ndarray, [T]
+            nearest parameter increment and decrement at which a vertex reaches the boundary
+        """
+        forward, reverse = np.full(len(m), np.inf), np.full(len(m), -np.inf)
+        f, c = self.field(j)
+        m, dm = (m, dm) if c is None else (m @ c, dm @ c)
+        p = self.members[i].vertices
+        for t, v, q, _, _ in _near(p, f, m, self.cutoff, self.max_bytes):
+            d, n = f.query(q)
+            velocity = np.einsum('ki,kij->kj', p[v], dm[t, 1:, 1:]) + dm[t, 0, 1:]
+            rate = np.einsum('ki,ki->k', velocity, n)
+            # vertices sliding along the boundary do not make a reliable linearized contact
+            eps = 0.05 * np.linalg.norm(velocity, axis=1) + 1e-9 * self.geometry.limit
+            with np.errstate(divide='ignore'):
+                root = -d / rate
+            closing, opening = rate < -eps, rate > eps
+            _reduce(t[closing], root[closing], forward, np.minimum)
+            _reduce(t[opening], root[opening], reverse, np.maximum)
+        return forward, reverse
+
+
+@dataclass(frozen=True)
+class Clearance:
+    a: int                  # member indices into the flattened arrangement
+    b: int
+    clearance: float        # smallest gap over the sweep; negative if the members interfere
+    penetration: float      # largest penetration depth over the sweep; zero if none
+    phase: float            # phase of the smallest gap
+    gap: np.ndarray         # smallest gap at each phase of the sweep, [T]
+
+
+def clearance(geometry: GearGeometry, phases, meshes=None, cutoff=None, max_bytes=64 * 2**20, members=None) -> List[Clearance]:
+    """Clearance and interference of all meshing pairs of members over a phase sweep
+
+    Vertices of each member are checked against the boundary of the other, in both directions
+
+    Parameters
+    ----------
+    phases: ndarray, [T]
+    meshes: List[Tuple[int, int]], optional
+        pairs of members to check; `geometry.meshes` by default
+    cutoff: float, optional
+        gaps larger than this may be reported as inf; 5% of the geometry size by default.
+        Penetrations are always resolved in full
+    max_bytes: int
+        memory budget of the vertex-phase pairs of a single chunk of phases
+    members: List[Profile], optional
+        the flattened arrangement at phase 0, to use in place of that of the geometry; such as perturbed copies
+    """
+    contacts = _Contacts(geometry, phases, cutoff, max_bytes, members)
+    phases = contacts.phases
+    motions = member_motions(geometry, phases)
+    results = []
+    for a, b in (geometry.meshes if meshes is None else meshes):
+        # from the body frame of a at phase 0, to the body frame of b at phase 0
+        m = motions[a] @ rigid_inverse(motions[b])
+        g = np.minimum(contacts.gap(a, m, b), contacts.gap(b, rigid_inverse(m), a))
+        w = int(np.argmin(g))
+        results.append(Clearance(a, b, float(g[w]), float(max(0.0, -g[w])), float(phases[w]), g))
+    return results
+
+
+@dataclass(frozen=True)
+class Backlash:
+    phase: np.ndarray           # phases of the sweep, [T]
+    meshes: list                # loaded meshes, as pairs of member indices
+    mesh_forward: np.ndarray    # free rotation of the output in the positive sense permitted by each mesh, [M, T]
+    mesh_reverse: np.ndarray    # same in the negative sense; negative, unless the mesh interferes, [M, T]
+    forward: np.ndarray         # free rotation of the output in the positive sense, of the whole train, [T]
+    reverse: np.ndarray         # same in the negative sense, [T]
+
+    @property
+    def backlash(self):
+        """Total free rotation of the output between contacts, [T]"""
+        return self.forward - self.reverse
+
+    @property
+    def transmission_error(self):
+        """Deviation of the output from its ideal motion, while it lags behind the input under load, [T]"""
+        return self.reverse
+
+
+def _angle(m):
+    """Rotation angle of point transformation matrices [..., 3, 3]"""
+    return np.arctan2(m[..., 1, 2], m[..., 1, 1])
+
+
+def backlash(geometry: GearGeometry, phases, iterations=8, cutoff=None, tolerance=None, max_bytes=64 * 2**20,
+             members=None) -> Backlash:
+    """Backlash and transmission error over a phase sweep, referred to the output
+
+    The play of each loaded mesh is found by rocking one of its members about its own centre,
+    while the other one holds; and is referred to the output through the rate at which that member
+    spins relative to the line of centres of the mesh, under the ideal motion.
+    Forward play advances the downstream member of the mesh, as given by `load_paths`.
+    Plays add up along the meshes in series of a load path, and the tightest of the parallel paths limits the train.
+
+    Parameters
+    ----------
+    phases: ndarray, [T]
+    iterations: int
+        maximum number of steps towards the contact of each mesh, each linearized and bounded by half the cutoff
+    cutoff: float, optional
+        contacts further away than this may be reported as inf; 5% of the geometry size by default
+    tolerance: float, optional
+        penetration accepted at a contact, as from vertex sampling; 10% of the cutoff by default
+    members: List[Profile], optional
+        the flattened arrangement at phase 0, to use in place of that of the geometry; such as perturbed copies
+
+    Returns
+    -------
+    Backlash
+        plays are nan at phases where a mesh interferes on both flanks, and no rocking clears it
+    """
+    contacts = _Contacts(geometry, phases, cutoff, max_bytes, members)
+    phases = contacts.phases
+    tolerance = 0.1 * contacts.cutoff if tolerance is None else tolerance
+    paths = geometry.load_paths
+    meshes = list(dict.fromkeys(m for path in paths for m in path))
+    h = 1e-6
+    motions = [member_motions(geometry, phases + e) for e in (-h, 0, h)]
+    centroid = [m.vertices.mean(axis=0) if len(m.vertices) else None for m in contacts.members]
+    center = lambda i, k: transform_batch(motions[k][i], centroid[i][None])[:, 0]
+
+    def rate(i, j):
+        """Rate at which member i spins relative to the line from its centre to that of j, per unit of output"""
+        line = [np.arctan2(*(center(j, k) - center(i, k)).T[::-1]) for k in (0, 2)]
+        spin = [_angle(motions[k][i]) for k in (0, 2)]
+        wrap = lambda x: (x + np.pi) % (2 * np.pi) - np.pi
+        return wrap((spin[1] - spin[0]) - (line[1] - line[0])) / (2 * h)
+
+    def play(a, b):
+        # rock whichever member spins fastest relative to the mesh;
+        # advancing the downstream member b is equivalent to reversing the upstream member a
+        wa, wb = -rate(a, b), rate(b, a)
+        k, w = (a, wa) if np.abs(wa).mean() >= np.abs(wb).mean() else (b, wb)
+        ma, mb = motions[1][a], motions[1][b]
+        c = center(k, 1)
+
+        def relative(delta, i=slice(None)):
+            """Transformations from the frame of a to that of b at phases i, with member k rocked by delta of output rotation"""
+            angle = w[i] * np.where(np.isfinite(delta), delta, 0)
+            cs, sn = np.cos(angle), np.sin(angle)
+            x, y = c[i, 0], c[i, 1]
+            rock = rigid_matrices(angle, x - (cs * x - sn * y), y - (sn * x + cs * y))
+            return (ma[i] @ rock if k == a else ma[i]) @ np.linalg.inv(mb[i] @ rock if k == b else mb[i])
+
+        # output rotation over which the vertices of k travel half the cutoff; contacts can not be missed within it
+        radius = np.linalg.norm(contacts.members[k].vertices - centroid[k], axis=1).max()
+        reach = 0.5 * contacts.cutoff / (np.abs(w) * radius)
+
+        def contact(forward):
+            delta, active = np.zeros(len(phases)), np.arange(len(phases))
+            for _ in range(iterations):
+                d = delta[active]
+                m = relative(d, active)
+                dm = (relative(d + h, active) - relative(d - h, active)) / (2 * h)
+                mi = np.linalg.inv(m)
+                fa, ra = contacts.roots(a, m, dm, b)
+                fb, rb = contacts.roots(b, mi, -mi @ dm @ mi, a)
+                step = np.clip(np.minimum(fa, fb) if forward else np.maximum(ra, rb), -reach[active], reach[active])
+                delta[active] = d + step
+                # converged once vertices move by a negligible fraction of the cutoff
+                active = active[np.abs(step) > 1e-4 * reach[active]]
+                if len(active) == 0:
+                    break
+            # contacts beyond the cutoff are not resolved
+            delta = np.where(np.abs(delta) > 2 * reach, np.inf if forward else -np.inf, delta)
+            # interference on both flanks can not be cleared by rocking; the contact found then still interferes
+            m = relative(delta)
+            gap = np.minimum(contacts.gap(a, m, b), contacts.gap(b, np.linalg.inv(m), a))
+            return np.where(gap < -tolerance, np.nan, delta)
+
+        return contact(True), contact(False)
+
+    plays = np.array([play(a, b) for a, b in meshes]).reshape(len(meshes), 2, len(phases))
+    mesh_forward, mesh_reverse = plays[:, 0], plays[:, 1]
+    index = {m: i for i, m in enumerate(meshes)}
+    series = lambda values, path: sum((values[index[m]] for m in path), np.zeros(len(phases)))
+    return Backlash(
+        phase=phases,
+        meshes=meshes,
+        mesh_forward=mesh_forward,
+        mesh_reverse=mesh_reverse,
+        forward=np.min([series(mesh_forward, path) for path in paths], axis=0),
+        reverse=np.max([series(mesh_reverse, path) for path in paths], axis=0),
+    )
@@ -55,6 +55,23 @@ class CompoundCycloidGeometry(GearGeometry):
             cycloid.generate_profiles(self.P2, self.f, self.b, self.cycloid),#, 'hypo', offset=0.5),
         )
 
+    @property
+    def symmetries(self):
+        return [{'r1': self.P1 + 1}, {'r2': self.P2 + 1}, {'p': self.P1}, {'p': self.P2}, {'c': 1}]
+
+    @property
+    def meshes(self):
+        return [(1, 0), (5, 4)]
+
+    @property
+    def load_paths(self):
+        loaded, out = self.kinematics.loaded, self.kinematics.output
+        return [[(p, r) if d == out else (r, p) for d, (p, r) in zip(['r1', 'r2'], self.meshes) if d in loaded]]
+
+    @property
+    def internal(self):
+        return (0, 4) if self.cycloid == 'hypo' else ()
+
     def arrange(self, phase):
         p1, p2 = self.generate_profiles
         r = self.phases(phase)
@@ -64,11 +81,6 @@ class CompoundCycloidGeometry(GearGeometry):
             cycloid.arrange(p2, r['p']+o, r['r2']+o, r['c']+o),
         )
 
-    def _plot(self, ax, phase):
-        (r1, p1, s1, c1), (r2, p2, s2, c2) = self.arrange(phase)
-        r1.plot(ax=ax, color='r')
-        p1.plot(ax=ax, color='r')
-        r2.plot(ax=ax, color='b')
-        p2.plot(ax=ax, color='b')
-        s1.plot(ax=ax, color='g')
-        s2.plot(ax=ax, color='g')
+    @property
+    def colors(self):
+        return ['r', 'r', 'g', None, 'b', 'b', 'g', None]
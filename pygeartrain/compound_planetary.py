@@ -8,7 +8,7 @@ from functools import cached_property
 from typing import Tuple
 
 from pygeartrain.core.kinematics import GearKinematics
-from pygeartrain.core.geometry import GearGeometry, flatten
+from pygeartrain.core.geometry import GearGeometry
 from pygeartrain import planetary
 
 
@@ -85,41 +85,69 @@ class CompoundPlanetaryGeometry(GearGeometry):
     b1: float
     b2: float
     show_carrier: bool
+    tolerance: float = None
+    radius: float = 1.0     # carrier radius of the compound planets; or a sequence of N, one per planet
 
     @classmethod
-    def create(cls, kinematics, G1, G2, N, b1=0.5, b2=0.5, show_carrier=False):
+    def create(cls, kinematics, G1, G2, N, b1=0.5, b2=0.5, show_carrier=False, tolerance=None):
         geometry = {**dict(zip(['R1','P1','S1'], G1)), **dict(zip(['R2', 'P2', 'S2'], G2))}
 
         return cls(
             kinematics=kinematics,
             geometry=geometry,
             G1=G1, G2=G2, N=N, b1=b1, b2=b2,
-            show_carrier=show_carrier
+            show_carrier=show_carrier, tolerance=tolerance,
         )
 
     @cached_property
     def generate_profiles(self, res=500):
         return (
-            planetary.generate_profiles(self.G1, self.N, self.b1, res=res, show_carrier=self.show_carrier),
+            planetary.generate_profiles(self.G1, self.N, self.b1, res=res, show_carrier=self.show_carrier,
+                                        tolerance=self.tolerance),
             # offset by half a planet tooth; works out nicer in P2=1 case
             planetary.generate_profiles(self.G2, self.N, self.b2, res=res, show_carrier=self.show_carrier,
-                                        offset=0.5*self.G2[1])
+                                        offset=0.5*self.G2[1], tolerance=self.tolerance)
         )
 
+    @property
+    def symmetries(self):
+        (R1, P1, S1), (R2, P2, S2) = self.G1, self.G2
+        return [
+            {'r1': R1}, {'s1': S1}, {'r2': R2}, {'s2': S2},
+            {'p': P1, 'c': R1 - P1}, {'p': P2, 'c': R2 - P2}, {'c': self.N},
+        ]
+
+    @property
+    def meshes(self):
+        # each stage flattens to ring, N planets, sun and carrier
+        return planetary.meshes(self.N) + planetary.meshes(self.N, offset=self.N + 3)
+
+    @property
+    def load_paths(self):
+        # every compound planet carries load through the meshes with those rings and suns that are loaded
+        N, loaded, out = self.N, self.kinematics.loaded, self.kinematics.output
+        stages = [('r1', 's1', 0), ('r2', 's2', N + 3)]
+        return [
+            [(o + i, m) if d == out else (m, o + i)
+             for r, s, o in stages for d, m in [(r, o), (s, o + N + 1)] if d in loaded]
+            for i in range(1, N + 1)
+        ]
+
+    @property
+    def internal(self):
+        return (0, self.N + 3)
+
     def arrange(self, phase):
         r = self.phases(phase)
         p1, p2 = self.generate_profiles
         return planetary.arrange(
             p1, self.G1, self.N,
-            r['r1'], r['p'], r['s1'], r['c'],
+            r['r1'], r['p'], r['s1'], r['c'], self.radius,
         ), planetary.arrange(
             p2, self.G2, self.N,
-            r['r2'], r['p'], r['s2'], r['c'],
+            r['r2'], r['p'], r['s2'], r['c'], self.radius,
         )
 
-    def _plot(self, ax, phase):
-        p1, p2 = self.arrange(phase)
-        for p in flatten(p1):
-            p.plot(ax=ax, color='r')
-        for p in flatten(p2):
-            p.plot(ax=ax, color='b')
+    @property
+    def colors(self):
+        return ['r'] * (self.N + 3) + ['b'] * (self.N + 3)
@@ -0,0 +1,180 @@
+"""Rendering of animation frames, and incremental writers holding no more than a single frame in memory"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class FrameRenderer:
+    """Offscreen Agg figure of a geometry, with persistent artists, rendering downsampled and quantized frames"""
+
+    def __init__(self, geometry, bin_size=3):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        self.fig = Figure()
+        FigureCanvasAgg(self.fig)
+        ax = self.fig.add_subplot()
+        self.lines, self.update = geometry._lines(ax)
+        geometry._decorate(ax)
+        self.bin_size = bin_size
+
+    def __call__(self, phase):
+        """Frame at the given phase, [H, W, 3] uint8"""
+        from pygeartrain.core.geometry import fig_to_array, image_downsample, quantize_lower
+        self.update(phase)
+        return quantize_lower(image_downsample(fig_to_array(self.fig), bin_size=self.bin_size), 4)
+
+
+def renderer_for(geometry, renderer='matplotlib'):
+    """Callable rendering frames of a geometry at a given phase;
+    'matplotlib' draws the decorated plot, 'raster' draws only the members, an order of magnitude faster"""
+    if renderer == 'matplotlib':
+        return FrameRenderer(geometry)
+    if renderer == 'raster':
+        from pygeartrain.core.raster import Rasterizer
+        return Rasterizer(geometry)
+    raise ValueError(f'Unknown renderer {renderer!r}')
+
+
+_renderer = None
+
+
+def _initialize(geometry, name, shape, renderer):
+    global _renderer
+    shm = shared_memory.SharedMemory(name=name)
+    _renderer = renderer_for(geometry, renderer)
+    _renderer.shm = shm     # keep the frame block valid
+    _renderer.frames = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+
+
+def _render(phases, start):
+    for i, phase in enumerate(phases):
+        _renderer.frames[start + i] = _renderer(phase)
+
+
+def render_frames(geometry, phases, workers=None, batch=None, renderer='matplotlib'):
+    """Generate the frames of a geometry at each phase, in order
+
+    With multiple workers, each worker process renders on a figure of its own,
+    into a block of shared memory holding one batch of frames; which the parent yields in order,
+    while the workers proceed with the next batch.
+
+    Parameters
+    ----------
+    phases: ndarray, [T]
+    workers: int, optional
+        number of worker processes; all cpus by default. 0 or 1 renders in this process
+    batch: int, optional
+        number of frames per batch
+    renderer: str
+        'matplotlib' or 'raster', as by `renderer_for`
+
+    Yields
+    ------
+    ndarray, [H, W, 3] uint8
+    """
+    phases = np.asarray(phases, dtype=float)
+    render = renderer_for(geometry, renderer)
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1 or len(phases) <= 1:
+        for phase in phases:
+            yield render(phase)
+        return
+
+    frame = render(phases[0])
+    batch = batch or workers * 8
+    chunk = -(-batch // workers)
+    # two batches; one being yielded, while the next renders
+    shape = (2 * batch,) + frame.shape
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+    frames = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+    try:
+        with ProcessPoolExecutor(workers, initializer=_initialize, initargs=(replace(geometry), shm.name, shape, renderer)) as pool:
+            def submit(start):
+                slot = (start // batch % 2) * batch
+                stop = min(start + batch, len(phases))
+                return slot, stop, [
+                    pool.submit(_render, phases[i:min(i + chunk, stop)], slot + i - start)
+                    for i in range(start, stop, chunk)
+                ]
+            pending = submit(0)
+            for start in range(0, len(phases), batch):
+                slot, stop, tasks = pending
+                for t in tasks:
+                    t.result()
+                if stop < len(phases):
+                    pending = submit(stop)
+                for i in range(stop - start):
+                    yield frames[slot + i].copy()
+    finally:
+        del frames
+        shm.close()
+        shm.unlink()
+
+
+class GifWriter:
+    """Animated GIF, encoded and written frame by frame
+
+    All frames share the global palette of the first frame; which suits renders of a geartrain,
+    that keep drawing the same few colours on the same background.
+    """
+
+    def __init__(self, filename, fps=30, loop=0, colors=256):
+        self.file = open(filename, 'wb')
+        self.duration = 1000 / fps
+        self.loop = loop
+        self.colors = colors
+        self.palette = None
+
+    def append(self, frame):
+        """Append a frame, [H, W, 3] uint8"""
+        from PIL import Image, GifImagePlugin
+        im = Image.fromarray(np.ascontiguousarray(frame[..., :3]))
+        if self.palette is None:
+            self.palette = im.quantize(self.colors, dither=Image.Dither.NONE)
+            header, _ = GifImagePlugin.getheader(self.palette.copy(), info={'loop': self.loop, 'optimize': False})
+            self.file.write(b''.join(header))
+        im = im.quantize(palette=self.palette, dither=Image.Dither.NONE)
+        for chunk in GifImagePlugin.getdata(im, duration=self.duration):
+            self.file.write(chunk)
+
+    def close(self):
+        if not self.file.closed:
+            self.file.write(b';')   # trailer
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class _ImageioWriter:
+    """Any format with a streaming imageio writer, such as mp4 through ffmpeg"""
+
+    def __init__(self, filename, fps=30):
+        import imageio.v2 as iio
+        self.writer = iio.get_writer(filename, fps=fps)
+
+    def append(self, frame):
+        self.writer.append_data(frame[..., :3])
+
+    def close(self):
+        self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def frame_writer(filename, fps=30):
+    """Incremental writer for the format implied by the file extension; use as a context manager,
+    appending frames one at a time"""
+    if str(filename).lower().endswith('.gif'):
+        return GifWriter(filename, fps=fps)
+    return _ImageioWriter(filename, fps=fps)
@@ -0,0 +1,53 @@
+"""Vectorized meshing and assembly constraints for planetary stages
+
+All geometry is relative to a unit carrier radius, consistent with `planetary.generate_profiles`;
+constraints are numpy masks, broadcasting over arrays of tooth counts and planet counts
+"""
+import numpy as np
+
+
+def planetary_stages(limit):
+    """Enumerate all meshing single stage tooth counts with the ring not exceeding `limit` teeth
+
+    Returns
+    -------
+    ndarray, [n, 3], int
+        (R, P, S) triplets, satisfying R = S + 2P
+    """
+    P, S = np.meshgrid(np.arange(1, limit), np.arange(1, limit), indexing='ij')
+    R = S + 2 * P
+    m = R <= limit
+    return np.stack([R[m], P[m], S[m]], axis=-1)
+
+
+def meshing(R, P, S):
+    """Planets bridge the gap between sun and ring"""
+    return R == S + 2 * P
+
+
+def equal_spacing(R, S, N):
+    """N planets can be spaced at equal angles along the carrier"""
+    return (R + S) % N == 0
+
+
+def tip_radius(P, S, b=0.5):
+    """Outer radius of a planet with epi/hypo profile, relative to the carrier radius"""
+    return (P + 2 * b) / (S + P)
+
+
+def planet_clearance(P, S, N, b=0.5, clearance=0.0):
+    """Neighbouring planets do not collide; always satisfied by a single planet"""
+    return (N < 2) | (2 * tip_radius(P, S, b) + clearance < 2 * np.sin(np.pi / np.maximum(N, 2)))
+
+
+def module_ratio(P1, S1, P2, S2):
+    """Ratio of tooth sizes of two stages sharing a carrier radius; 1 if the stages share their module"""
+    m1, m2 = S1 + P1, S2 + P2
+    return np.maximum(m1, m2) / np.minimum(m1, m2)
+
+
+def identical_planets(R1, P1, R2, P2, N):
+    """Both layers of a compound planet can be made in the same relative phase for all planets,
+    such that all compound planets are identical parts"""
+    L = np.lcm(P1, P2)
+    return ((R2 * P1 - R1 * P2) * L) % (P1 * P2 * N) == 0
@@ -0,0 +1,201 @@
+"""Caching of expensive deterministic results
+
+`disk_cache` persists results such as symbolic solves, which would otherwise be recomputed in every new process.
+Its directory and size cap default to the environment variables
+PYGEARTRAIN_CACHE_DIR and PYGEARTRAIN_CACHE_SIZE (in bytes),
+and can be changed on the `disk_cache` instance at runtime.
+An empty directory string disables the cache.
+
+`profile_cache` shares generated gear profiles between all geometry instances within a process.
+Its size cap defaults to the environment variable PYGEARTRAIN_PROFILE_CACHE_SIZE (in bytes).
+"""
+import functools
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import threading
+from collections import OrderedDict, namedtuple
+
+
+class DiskCache:
+    """Pickle based key-value store, with least-recently-used eviction once the size cap is exceeded"""
+
+    def __init__(self, directory=None, max_bytes=None):
+        if directory is None:
+            directory = os.environ.get(
+                'PYGEARTRAIN_CACHE_DIR',
+                os.path.join(os.path.expanduser('~'), '.cache', 'pygeartrain'))
+        if max_bytes is None:
+            max_bytes = int(os.environ.get('PYGEARTRAIN_CACHE_SIZE', 64 * 2**20))
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(*parts):
+        """Content address of a tuple of plain python values"""
+        return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.pickle')
+
+    def _entries(self):
+        try:
+            with os.scandir(self.directory) as it:
+                return [e for e in it if e.name.endswith('.pickle') and e.is_file()]
+        except OSError:
+            return []
+
+    def get(self, key, default=None):
+        if not self.directory:
+            return default
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return default
+        except Exception:
+            # corrupt or incompatible entry; treat as a miss
+            self._remove(path)
+            return default
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return value
+
+    def put(self, key, value):
+        if not self.directory:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # write to a temporary file first, so concurrent workers never observe partial entries
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            return
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the total size is within the cap"""
+        entries = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in self._entries()]
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        for e in self._entries():
+            self._remove(e.path)
+
+    @property
+    def size(self):
+        return sum(e.stat().st_size for e in self._entries())
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'entries', 'bytes', 'max_bytes'])
+
+
+def nbytes(value, seen=None):
+    """Approximate memory footprint of a value, dominated by the arrays it references"""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(nbytes(v, seen) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(nbytes(v, seen) for v in value.values())
+    fields = getattr(value, '__dict__', None)
+    if fields is None:
+        slots = [s for c in type(value).__mro__ for s in getattr(c, '__slots__', ())]
+        fields = {s: getattr(value, s) for s in slots if hasattr(value, s)}
+    return sys.getsizeof(value) + sum(nbytes(v, seen) for v in fields.values())
+
+
+class MemoryCache:
+    """In-process key-value store, with least-recently-used eviction once the total size of its values exceeds the cap
+
+    Values are shared between all callers, and should be treated as immutable
+    """
+
+    def __init__(self, max_bytes=None):
+        if max_bytes is None:
+            max_bytes = int(os.environ.get('PYGEARTRAIN_PROFILE_CACHE_SIZE', 256 * 2**20))
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value, _ = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        size = nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = value, size
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, s) = self._entries.popitem(last=False)
+                self._bytes -= s
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, len(self._entries), self._bytes, self.max_bytes)
+
+    def memoize(self, func):
+        """Decorator caching the results of func, keyed on its name and arguments;
+        calls with unhashable arguments, such as lists, are passed through uncached"""
+        missing = object()
+
+        @functools.wraps(func)
+        def wrapped(*args, **kwargs):
+            key = (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                return func(*args, **kwargs)
+            value = self.get(key, missing)
+            if value is missing:
+                value = func(*args, **kwargs)
+                self.put(key, value)
+            return value
+        return wrapped
+
+
+disk_cache = DiskCache()
+profile_cache = MemoryCache()
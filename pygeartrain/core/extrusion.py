@@ -0,0 +1,268 @@
+"""Extrusion of gear profiles into twisted stacks of z-slices, for helical and herringbone gears
+
+A helical geartrain meshes at every height like the planar geartrain does,
+if the slice of every member at height z is rotated about its own axis in proportion to its spin;
+that is, if each height shows the same arrangement, advanced by a phase proportional to z.
+Axes are fixed in the frame of the carrier, so spins are taken relative to it.
+
+Stacks of slices are closed into watertight triangle meshes, and streamed to binary STL.
+"""
+from functools import reduce
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from pygeartrain.core.geometry import GearGeometry, flatten
+from pygeartrain.core.pga import rigid_matrices, transform_batch
+from pygeartrain.core.profiles import Profile
+
+
+def filter_close(profile: Profile, tolerance: float) -> Profile:
+    """Drop vertices within tolerance of their predecessor in their loop, including the closing edge"""
+    v = profile.vertices
+    if len(v) == 0:
+        return profile
+    previous = profile.edges[:, 0]
+    keep = np.linalg.norm(v - v[previous], axis=1) > tolerance
+    # a loop collapsing to a single point keeps its first vertex
+    starts = profile.offsets[:-1][np.diff(profile.offsets) > 0]
+    keep[starts] |= np.add.reduceat(keep.astype(int), starts) == 0
+    counts = np.add.reduceat(keep.astype(int), starts)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    return Profile(v[keep], offsets)
+
+
+def slices(profile: Profile, z, angles, center=(0, 0)) -> np.ndarray:
+    """Copies of a profile at heights z, each rotated about center by the corresponding angle
+
+    Parameters
+    ----------
+    z: ndarray, [Z]
+    angles: ndarray, [Z]
+
+    Returns
+    -------
+    ndarray, [Z, V, 3]
+    """
+    z = np.asarray(z, dtype=float)
+    angles = np.broadcast_to(np.asarray(angles, dtype=float), z.shape)
+    c = np.asarray(center, dtype=float)
+    # rotation about the center; translate it to the origin, rotate, and translate back
+    m = rigid_matrices(angles, c[0], c[1])
+    m[..., 0, 1:] -= c @ m[..., 1:, 1:]
+    out = np.empty(z.shape + (len(profile.vertices), 3))
+    out[..., :2] = transform_batch(m, profile.vertices)
+    out[..., 2] = z[:, None]
+    return out
+
+
+def helix(z, tan_helix, radius, herringbone=False) -> np.ndarray:
+    """Twist angle at heights z of a gear of the given radius and helix angle there;
+    a herringbone gear mirrors the twist about z = 0"""
+    z = np.asarray(z, dtype=float)
+    return (np.abs(z) if herringbone else z) * tan_helix / radius
+
+
+def member_axes(geometry: GearGeometry, carrier=None, delta=1e-3):
+    """Spin and axis of each member of the flattened arrangement at phase 0, relative to the carrier
+
+    Parameters
+    ----------
+    carrier: str, optional
+        dof of the frame in which all axes are fixed, rotating about the origin, such as the carrier of a planetary;
+        the fixed frame by default
+
+    Returns
+    -------
+    rates: ndarray, [M]
+        rotation of each member relative to the carrier, per unit phase; zero for empty members
+    centers: ndarray, [M, 2]
+        axis of each member in the arrangement at phase 0; the origin for members not spinning
+    """
+    from pygeartrain.analysis import member_motions
+    rate = geometry.ratios_f[carrier] if carrier else 0.0
+    inverse = rigid_matrices(-rate * delta)
+    motions = member_motions(geometry, [delta])
+    rates, centers = np.zeros(len(motions)), np.zeros((len(motions), 2))
+    for i, m in enumerate(motions):
+        if m is None:
+            continue
+        m = m[0] @ inverse
+        angle = np.arctan2(m[1, 2], m[1, 1])
+        if abs(angle) < 1e-9:
+            continue
+        rates[i] = angle / delta
+        # the fixed point p of the relative motion; p = t + p R
+        centers[i] = np.linalg.solve((np.eye(2) - m[1:, 1:]).T, m[0, 1:])
+    return rates, centers
+
+
+def extrude(
+        geometry: GearGeometry,
+        z,
+        tan_helix: float,
+        carrier=None,
+        reference=None,
+        herringbone=False,
+        centered=False,
+        tolerance=1e-7,
+) -> List[Optional[np.ndarray]]:
+    """Twisted z-slices of every member of a geometry, keeping all helical meshes conjugate at every height
+
+    Parameters
+    ----------
+    z: ndarray, [Z]
+        heights of the slices
+    tan_helix: float
+        tangent of the helix angle at the outer radius of the reference member
+    carrier: str, optional
+        dof of the frame in which all axes are fixed, as by `member_axes`
+    reference: int, optional
+        index of the member defining the helix angle; the first spinning member by default
+    herringbone: bool
+        mirror the twist about z = 0
+    centered: bool
+        translate each member such that its axis lies on the origin, as for modelling it in isolation
+    tolerance: float
+        vertices closer than this to their predecessor are dropped, relative to the plot bounds
+
+    Returns
+    -------
+    List[Profile]
+        slices of each member of the flattened arrangement at phase 0, with vertices [Z, V, 3];
+        None for empty members
+    """
+    rates, centers = member_axes(geometry, carrier)
+    members = flatten(geometry.arrange(0.0))
+    if reference is None:
+        reference = int(np.flatnonzero(rates)[0])
+    radius = np.linalg.norm(members[reference].vertices - centers[reference], axis=1).max()
+    # advancement of the whole arrangement with height; the reference turns by its own helix twist
+    phase = helix(z, tan_helix, radius, herringbone) / rates[reference]
+
+    out = []
+    for member, rate, center in zip(members, rates, centers):
+        if len(member.vertices) == 0:
+            out.append(None)
+            continue
+        member = filter_close(member, tolerance * geometry.limit)
+        s = slices(member, z, rate * phase, center)
+        if centered:
+            s[..., :2] -= center
+        out.append(Profile(s, member.offsets))
+    return out
+
+
+def cap_triangles(profile: Profile) -> np.ndarray:
+    """Triangulation of the region enclosed by the loops of a profile, by the even-odd rule
+
+    Parameters
+    ----------
+    profile: Profile
+        with vertices [V, 2]; or [V, 3], of which z is ignored
+
+    Returns
+    -------
+    ndarray, [T, 3]
+        vertex indices of counter clockwise triangles, using no vertices other than those of the profile
+    """
+    import shapely
+    from scipy.spatial import cKDTree
+    xy = profile.vertices[:, :2]
+    loops = [shapely.Polygon(l) for l in profile.loops if len(l) > 2]
+    region = reduce(shapely.symmetric_difference, loops)
+    corners = shapely.get_coordinates(shapely.constrained_delaunay_triangles(region)).reshape(-1, 4, 2)[:, :3]
+    distance, index = cKDTree(xy).query(corners)
+    if distance.max(initial=0) > 1e-9 * (1 + np.abs(xy).max()):
+        raise ValueError('Triangulation introduced vertices; are the loops of the profile intersecting?')
+    a, b, c = (xy[index[:, i]] for i in range(3))
+    u, v = b - a, c - a
+    cw = u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0] < 0
+    index[cw] = index[cw][:, ::-1]
+    return index
+
+
+def rim(extruded: Profile, radius: float, segments=None) -> Profile:
+    """Add a circular outer loop to every slice, around the centroid of its vertices;
+    closing the material of internal members, such as ring gears, on the outside"""
+    v = extruded.vertices
+    if segments is None:
+        edge = np.linalg.norm(np.diff(v[0, :, :2], axis=0), axis=1).mean()
+        segments = max(16, int(np.ceil(2 * np.pi * radius / edge)))
+    a = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    circle = np.empty((len(v), segments, 3))
+    circle[..., :2] = v[:, None, :, :2].mean(axis=2) + radius * np.stack([np.cos(a), np.sin(a)], axis=-1)
+    circle[..., 2] = v[:, :1, 2]
+    offsets = np.concatenate([extruded.offsets, [extruded.offsets[-1] + segments]])
+    return Profile(np.concatenate([v, circle], axis=1), offsets)
+
+
+def mesh(extruded: Profile) -> Tuple[np.ndarray, np.ndarray]:
+    """Watertight triangle mesh of a stack of slices, with outward facing triangles
+
+    Side walls connect consecutive slices by index arithmetic alone; the first and last slice are capped.
+    Loops nested an even number of times bound material on their inside; holes on their outside.
+    Internal members need a `rim` first.
+
+    Parameters
+    ----------
+    extruded: Profile
+        with vertices [Z, V, 3], slices at monotonic heights, as from `extrude`
+
+    Returns
+    -------
+    vertices: ndarray, [Z * V, 3]
+    faces: ndarray, [F, 3]
+        vertex indices of counter clockwise triangles, seen from outside
+    """
+    from pygeartrain.analysis import _sides
+    v = extruded.vertices
+    Z, V = v.shape[:2]
+    base = Profile(v[0, :, :2], extruded.offsets)
+    rising = v[-1, 0, 2] > v[0, 0, 2]
+
+    # side walls; the right hand normal of an edge of an outward loop points out of the material
+    lengths = np.diff(extruded.offsets)
+    closed = lengths > 2
+    signs = np.zeros(len(lengths))
+    signs[closed] = _sides([l for l, c in zip(base.loops, closed) if c])
+    edges = base.edges
+    flip = (np.repeat(signs, lengths) < 0) != (not rising)
+    keep = np.repeat(closed, lengths)
+    a, b = edges[keep, 0], edges[keep, 1]
+    a, b = np.where(flip[keep], b, a), np.where(flip[keep], a, b)
+    layer = np.arange(Z - 1)[:, None] * V
+    a, b = (a + layer).ravel(), (b + layer).ravel()
+    walls = np.concatenate([np.stack([a, b, b + V], axis=1), np.stack([a, b + V, a + V], axis=1)])
+
+    # caps share the triangulation of the first slice, which the twist only rotates
+    cap = cap_triangles(base)
+    bottom, top = (cap[:, ::-1], cap + (Z - 1) * V) if rising else (cap, cap[:, ::-1] + (Z - 1) * V)
+    return v.reshape(-1, 3), np.concatenate([walls, bottom, top])
+
+
+_STL = np.dtype([('normal', '<f4', 3), ('vertices', '<f4', (3, 3)), ('attribute', '<u2')])
+
+
+def write_stl(filename, meshes, chunk=2**16, header=b'pygeartrain'):
+    """Stream triangle meshes to a single binary STL file, a chunk of triangles at a time
+
+    Parameters
+    ----------
+    meshes: List[(vertices [N, 3], faces [F, 3])]
+        as from `mesh`
+    chunk: int
+        number of triangles converted to the 50 byte STL records at once
+    """
+    with open(filename, 'wb') as f:
+        f.write(header[:80].ljust(80, b'\0'))
+        f.write(np.uint32(sum(len(faces) for _, faces in meshes)).tobytes())
+        record = np.zeros(chunk, _STL)
+        for vertices, faces in meshes:
+            for start in range(0, len(faces), chunk):
+                corners = vertices[faces[start:start + chunk]]
+                r = record[:len(corners)]
+                n = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+                r['normal'] = n / np.maximum(np.linalg.norm(n, axis=1, keepdims=True), 1e-300)
+                r['vertices'] = corners
+                f.write(r.tobytes())
@@ -1,8 +1,13 @@
+import itertools
+import tempfile
+from contextlib import ExitStack
 from dataclasses import dataclass
-from typing import Dict
+from fractions import Fraction
+from functools import cached_property, reduce
+from math import gcd, lcm
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
-from sympy.core.cache import cached_property
 
 from pygeartrain.core.kinematics import GearKinematics
 
@@ -16,12 +21,11 @@ def flatten(l):
         out.append(l)
     return out
 
-def fig_to_array(fig):
-    import matplotlib.pyplot as plt
-    canvas = plt.gca().figure.canvas
-    canvas.draw()
-    data = np.frombuffer(canvas.tostring_rgb(), dtype=np.uint8)
-    return data.reshape((int(fig.bbox.bounds[3]), int(fig.bbox.bounds[2])) + (3,))
+def fig_to_array(fig, draw=True):
+    """RGB view of the Agg buffer of a figure, [H, W, 3]; valid until the next draw"""
+    if draw:
+        fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba())[..., :3]
 
 def image_downsample(img, bin_size = 2):
 	ix, iy = img.shape[:2]
@@ -44,9 +48,67 @@ class GearGeometry:
         return {k: r.subs(self.geometry) for k, r in self.kinematics.solve.items()}
     @cached_property
     def ratios_f(self):
-        return {k: float(r.evalf()) for k, r in self.ratios.items()}
+        return {k: float(r) for k, r in self.kinematics.evaluate(**self.geometry).items()}
+    @cached_property
+    def ratios_exact(self):
+        return self.kinematics.solve_exact(**self.geometry)
+    @cached_property
+    def configurations(self):
+        """Ratios of all admissible drive configurations of this geometry, by descending magnitude"""
+        configs, ratios = type(self.kinematics).evaluate_configurations(**self.geometry)
+        ranked = sorted(
+            ((c, float(r)) for c, r in zip(configs, ratios) if np.isfinite(r)),
+            key=lambda cr: -abs(cr[1])
+        )
+        return dict(ranked)
     def phases(self, phase):
         return {k:v * phase for k,v in self.ratios_f.items()}
+
+    @property
+    def symmetries(self) -> List[Dict[str, int]]:
+        """Integer combinations of dof angles, which leave the arrangement unchanged
+        whenever they advance by a multiple of 2pi; all of them holding at once.
+        A gear with N teeth rotating with dof x contributes {x: N}"""
+        raise NotImplementedError
+
+    @property
+    def meshes(self) -> List[Tuple[int, int]]:
+        """Pairs of members in contact, or at risk of it, as indices into the flattened arrangement"""
+        raise NotImplementedError
+
+    @property
+    def load_paths(self) -> List[List[Tuple[int, int]]]:
+        """Parallel paths of meshes in series, which carry load between the loaded dofs of the configuration.
+        Meshes are (upstream, downstream) pairs of member indices, with the downstream member on the side of the output"""
+        raise NotImplementedError
+
+    @property
+    def internal(self) -> Tuple[int, ...]:
+        """Members of the flattened arrangement with their material outside of their outer loops,
+        such as ring gears"""
+        return ()
+
+    @cached_property
+    def period_exact(self) -> Fraction:
+        """Exact repeat period of the whole arrangement, in turns of the output;
+        zero if nothing moves"""
+        ratios = self.ratios_exact
+        q = [sum(c * ratios[k] for k, c in s.items()) for s in self.symmetries]
+        q = [abs(Fraction(x)) for x in q if x]
+        if not q:
+            return Fraction(0)
+        # smallest turn count that advances every combination by a whole number of revolutions
+        return Fraction(lcm(*[x.denominator for x in q]), reduce(gcd, [x.numerator for x in q]))
+
+    @cached_property
+    def period(self) -> float:
+        """Repeat period of the whole arrangement, in phase units (output radians)"""
+        return float(2 * np.pi * self.period_exact)
+
+    def reduce_phase(self, phase):
+        """Equivalent phase within the first period; the arrangement is identical up to its symmetries,
+        such as planets trading places or gears advanced by whole teeth"""
+        return np.mod(phase, self.period) if self.period else phase
     @cached_property
     def ratio(self):
         return self.ratios[self.kinematics.input]
@@ -71,16 +133,128 @@ class GearGeometry:
         """Arrange profiles given phase advancement of whole geartrain"""
         raise NotImplementedError
 
+    def arrange_sweep(self, phases, out=None, periodic=False):
+        """Arrange profiles for a whole sweep of phases at once
+
+        Parameters
+        ----------
+        phases: ndarray, [T]
+        out: List[ndarray], optional
+            preallocated [T, V, 2] arrays to write into, such as returned by a previous call
+        periodic: bool
+            if True, phases equivalent under `reduce_phase` are arranged only once.
+            Members are then identical only up to the symmetries of the arrangement,
+            which suffices for rendering and for statistics over symmetric members
+
+        Returns
+        -------
+        List[ndarray], [T, V, 2]
+            vertices of each member of the flattened arrangement, for all phases
+        """
+        phases = np.asarray(phases, dtype=float)
+        if periodic and self.period:
+            key = np.round(self.reduce_phase(phases) / self.period, 9) % 1
+            _, index, inverse = np.unique(key, return_index=True, return_inverse=True)
+            unique = self.arrange_sweep(self.reduce_phase(phases[index]))
+            if out is None:
+                return [u[inverse] for u in unique]
+            for o, u in zip(out, unique):
+                np.take(u, inverse, axis=0, out=o)
+            return out
+        members = flatten(self.arrange(phases))
+        shapes = [phases.shape + m.vertices.shape[-2:] for m in members]
+        if out is None:
+            # moving members are freshly transformed already; only static members need a copy
+            return [
+                m.vertices if m.vertices.shape == shape else
+                np.array(np.broadcast_to(m.vertices, shape))
+                for m, shape in zip(members, shapes)
+            ]
+        for o, m in zip(out, members):
+            o[...] = m.vertices
+        return out
+
+    def sweep_chunks(self, phases, max_bytes=64 * 2**20):
+        """Generate `arrange_sweep` over consecutive chunks of phases, bounded in memory
+
+        Yields
+        ------
+        slice
+            range of phases covered by the chunk
+        List[ndarray], [t, V, 2]
+            vertices of each member; the buffers are reused between chunks
+        """
+        phases = np.asarray(phases, dtype=float)
+        members = flatten(self.arrange(phases[:1]))
+        per_phase = sum(np.prod(m.vertices.shape[-2:]) * m.vertices.dtype.itemsize for m in members)
+        # buffers and the transform temporaries of a single chunk
+        chunk = int(max(1, min(len(phases), max_bytes // max(1, 2 * per_phase))))
+        buffers = [np.empty((chunk,) + m.vertices.shape[-2:], m.vertices.dtype) for m in members]
+        for start in range(0, len(phases), chunk):
+            s = slice(start, min(start + chunk, len(phases)))
+            n = s.stop - s.start
+            yield s, self.arrange_sweep(phases[s], out=[b[:n] for b in buffers])
+
     @cached_property
     def limit(self):
         """For fixing plot bounds"""
         profiles = flatten(self.arrange(0))
         return max(p.limit for p in profiles)*1.05
 
-    def _plot(self, phase, ax, **kwargs):
-        """Plotting"""
+    def _plot(self, phase, ax, colors=None):
+        """Plot the members drawn in `colors`, batching all segments of one colour into a single LineCollection;
+        so that the number of artists does not grow with the number of members
+
+        Returns
+        -------
+        List[LineCollection]
+        """
+        from matplotlib.collections import LineCollection
+        colors = self.colors if colors is None else colors
+        groups = {}
+        for m, c in zip(flatten(self.arrange(phase)), colors):
+            if c is not None and len(m.vertices):
+                groups.setdefault(c, []).append(m.vertices[m.edges])
+        return [
+            ax.add_collection(LineCollection(np.concatenate(segments), colors=c))
+            for c, segments in groups.items()
+        ]
+
+    @property
+    def colors(self) -> List[Optional[str]]:
+        """Colour of each member of the flattened arrangement, as drawn by `_plot`; None for members not drawn"""
         raise NotImplementedError
 
+    def _lines(self, ax, phase=0):
+        """One persistent line artist per drawn member, and a function moving them all to another phase
+
+        Returns
+        -------
+        List[Line2D]
+        update: callable
+            taking a phase, and returning the updated artists
+        """
+        members = flatten(self.arrange(phase))
+        drawn = [(i, c) for i, c in enumerate(self.colors) if c is not None]
+        index = [members[i].closed_index() for i, _ in drawn]
+        lines = [ax.plot(*members[i].closed().T, color=c)[0] for i, c in drawn]
+
+        def update(phase):
+            members = flatten(self.arrange(phase))
+            for line, (i, _), (vertex, separator) in zip(lines, drawn, index):
+                xy = members[i].vertices[vertex].astype(float, copy=False)
+                xy[separator] = np.nan
+                line.set_data(xy[:, 0], xy[:, 1])
+            return lines
+        return lines, update
+
+    def _decorate(self, ax):
+        ax.set_title(str(self))
+        ax.axis('off')
+        lim = self.limit
+        ax.set_xlim(-lim, +lim)
+        ax.set_ylim(-lim, +lim)
+
     def plot(self, phase=0, ax=None, show=True, filename=None, **kwargs):
         import matplotlib.pyplot as plt
         if ax is None:
@@ -90,52 +264,74 @@ class GearGeometry:
 
         self._plot(phase=phase, ax=ax, **kwargs)
 
-        plt.title(str(self))
-        plt.axis('off')
-        lim = self.limit
-        plt.xlim(-lim, +lim)
-        plt.ylim(-lim, +lim)
+        self._decorate(ax)
         if filename:
             fig.savefig(filename)
         if show:
             plt.show()
 
-    def animate(self, scale=None):
+    def animate(self, scale=None, fps=60):
+        """Real-time animation, advancing the phase by scale every frame
+
+        The artists of all members are created once, and only their vertex data changes between frames;
+        so that blitting redraws nothing but the lines themselves
+        """
         import matplotlib.pyplot as plt
         import matplotlib.animation as animation
 
         if scale is None:
             rs = [np.abs(1/r) for r in self.ratios_f.values() if r]
             scale = np.prod(rs) ** (1 / len(rs)) / 50
-        counter = [0]
-        def updatefig(*args):
-            counter[0] += 1
-            phase = counter[0] * scale
-            ax = plt.gca()
-            ax.cla()
-            self.plot(phase=phase, ax=ax, show=False)
-
-        self.plot(phase=0, show=False)
-        ani = animation.FuncAnimation(plt.gcf(), updatefig, interval=10, blit=False)
+        fig, ax = plt.subplots()
+        lines, update = self._lines(ax)
+        for line in lines:
+            line.set_animated(True)
+        self._decorate(ax)
+
+        ani = animation.FuncAnimation(
+            fig, lambda i: update(i * scale), frames=itertools.count(),
+            interval=1000 / fps, blit=True, cache_frame_data=False,
+        )
         plt.show()
+        return ani
 
-    def save_animation(self, frames, filename, total=np.pi/2):
-        import matplotlib.pyplot as plt
-        self.plot(show=False)
-        fig = plt.gcf()
-        ax = plt.gca()
-        data = []
-        for i in range(frames):
-            ax.cla()
-            phase = i/frames*total
-            self.plot(ax=ax, phase=phase, show=False)
-            data.append(image_downsample(fig_to_array(fig), bin_size=3))
-        data = np.array(data)
-        data = quantize_lower(data, 4)
-        # from PIL import Image
-        # img = Image.fromarray(data.reshape(-1, data.shape[-2], data.shape[-1]))
-        # img = img.quantize(colors=32).convert(mode='RGB')
-        # data = np.array(img).reshape(data.shape)
-        import imageio.v3 as iio
-        iio.imwrite(filename, data, loop=0, fps=30)
-        plt.close(fig)
+    def save_animation(self, frames, filename, total=np.pi/2, fps=30, workers=0, renderer='matplotlib'):
+        """Render frames evenly spaced over total phase; a total of None renders exactly one period.
+
+        Frames are rendered on an offscreen Agg canvas, and streamed to the writer one at a time,
+        so memory does not grow with the number of frames. Only if the total spans more than one period,
+        frames equivalent under the periodicity of the geartrain are rendered only once;
+        and spooled to a temporary file, to be read back for their repeats.
+        With workers, frames are rendered in as many processes; None uses all cpus.
+        The 'raster' renderer draws only the members, without matplotlib, an order of magnitude faster"""
+        from pygeartrain.core.animation import frame_writer, render_frames
+        if total is None:
+            total = self.period
+        phases = np.arange(frames) / frames * total
+        repeats = bool(self.period) and total > self.period
+        if repeats:
+            keys = np.round(self.reduce_phase(phases) / self.period, 9) % 1
+            _, first, source = np.unique(keys, return_index=True, return_inverse=True)
+            order = np.argsort(first)
+            # renders in order of first appearance, and the index of the render shown by each frame
+            phases, source = phases[first[order]], np.argsort(order)[source]
+        rendered = render_frames(self, phases, workers=workers, renderer=renderer)
+        with frame_writer(filename, fps=fps) as writer, ExitStack() as stack:
+            spool, count = None, 0
+            for i in range(frames):
+                if not repeats:
+                    writer.append(next(rendered))
+                    continue
+                if source[i] == count:
+                    frame = next(rendered)
+                    if spool is None:
+                        spool = np.memmap(
+                            stack.enter_context(tempfile.TemporaryFile()),
+                            dtype=frame.dtype, mode='w+', shape=(len(phases),) + frame.shape)
+                    spool[count] = frame
+                    count += 1
+                    writer.append(frame)
+                else:
+                    writer.append(spool[source[i]])
+            spool = None
+            rendered.close()
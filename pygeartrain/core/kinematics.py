@@ -1,7 +1,17 @@
-from typing import List
+from fractions import Fraction
+from functools import cached_property
+from typing import Callable, Dict, List, Tuple
 
-from sympy import symbols, linsolve, parse_expr
-from sympy.core.cache import cached_property
+import numpy as np
+
+from pygeartrain.core.cache import disk_cache
+from pygeartrain.core import rational
+
+
+# compiled ratio functions and equations, shared between all instances with identical equations and boundary conditions;
+# kept out of the instances, which remain picklable
+_compiled = {}
+_equations = {}
 
 
 class GearKinematics:
@@ -34,15 +44,156 @@ class GearKinematics:
         dict[str, sympy equation]
             For each dof-key, an equation how this dof advances with one unit of output rotation,
             expressed in terms of all geometric variables
+
+        Notes
+        -----
+        Solutions are persisted in the disk cache, keyed on the equations and boundary conditions,
+        so that subsequent processes can skip the symbolic solve altogether
         """
-        dofs = symbols(self.dofs())
-        geometry = symbols(self.geometry())
-        loc = {s.name: s for s in dofs + geometry}
+        import sympy
+        from sympy import symbols, linsolve, parse_expr
 
         bcs = [f'{self.output} - 1'] + list(self.aux)    # unit step applied to output
-        res = linsolve([parse_expr(e, local_dict=loc) for e in self.equations + bcs], dofs)
-        assert len(res.args) == 1
-        return dict(zip(self.dofs(), res.args[0]))
+        key = disk_cache.key('solve', sympy.__version__, self.equations, bcs)
+        solution = disk_cache.get(key)
+        if solution is None:
+            dofs = symbols(self.dofs())
+            geometry = symbols(self.geometry())
+            loc = {s.name: s for s in dofs + geometry}
+
+            res = linsolve([parse_expr(e, local_dict=loc) for e in self.equations + bcs], dofs)
+            assert len(res.args) == 1
+            solution = dict(zip(self.dofs(), res.args[0]))
+            disk_cache.put(key, solution)
+        return solution
+
+    @property
+    def compiled(self) -> Dict[str, Callable]:
+        """Compiled numeric form of `solve`
+
+        The sympy expressions are lambdified once per topology and configuration,
+        and shared between all kinematics instances describing the same system.
+
+        Returns
+        dict[str, callable]
+            For each dof-key, a function taking all geometric variables as keyword arguments,
+            which may be arbitrarily shaped numpy arrays, and returning the broadcast array of ratios
+        """
+        key = (tuple(self.equations), self.output, tuple(self.aux))
+        if key not in _compiled:
+            from sympy import symbols, lambdify
+            names = sorted(self.geometry())
+            args = symbols(names)
+            args = args if isinstance(args, (list, tuple)) else [args]
+            _compiled[key] = {
+                k: _broadcasting(lambdify(args, r, modules='numpy'), names)
+                for k, r in self.solve.items()
+            }
+        return _compiled[key]
+
+    def evaluate(self, **geometry) -> Dict[str, np.ndarray]:
+        """Evaluate the ratios of all dofs for (arrays of) geometric variables in a single broadcast call"""
+        return {k: f(**geometry) for k, f in self.compiled.items()}
+
+    @property
+    def _linear(self):
+        """Equations and boundary conditions compiled for exact numerical evaluation"""
+        bcs = [f'{self.output} - 1'] + list(self.aux)
+        key = tuple(self.equations + bcs)
+        if key not in _equations:
+            _equations[key] = sorted(self.dofs()), rational.compile_equations(self.equations + bcs)
+        return _equations[key]
+
+    def solve_exact(self, **geometry) -> Dict[str, Fraction]:
+        """Exact rational solve for a single concrete geometry, bypassing sympy
+
+        Returns
+        dict[str, Fraction]
+            For each dof-key, how this dof advances with one unit of output rotation
+        """
+        dofs, code = self._linear
+        A, b = rational.linear_system(code, dofs, geometry)
+        return dict(zip(dofs, rational.fraction_solve(A, b)))
+
+    def solve_batch(self, **geometry) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Exact solve for integer arrays of geometries, by fraction-free elimination
+
+        Returns
+        dict[str, (ndarray, ndarray)]
+            For each dof-key, reduced numerator and denominator arrays of the broadcast geometry shape
+        """
+        dofs, code = self._linear
+        values = {k: np.asarray(v) for k, v in geometry.items()}
+        shape = np.broadcast_shapes(*[v.shape for v in values.values()])
+        A, b = rational.linear_system(code, dofs, values)
+        if len(A) != len(dofs):
+            raise ValueError('Batched exact solve requires as many equations as dofs')
+        A = np.stack([np.stack([np.broadcast_to(a, shape) for a in row], axis=-1) for row in A], axis=-2)
+        b = np.stack([np.broadcast_to(r, shape) for r in b], axis=-1)
+        num, den = rational.bareiss_solve(A.astype(np.int64), b.astype(np.int64))
+        return {d: (num[..., i], den[..., i]) for i, d in enumerate(dofs)}
+
+    @classmethod
+    def configurations(cls):
+        """All configurations (input, output, *fixed) of distinct dofs,
+        fixing enough dofs to leave a single degree of freedom"""
+        import itertools
+        dofs = sorted(cls.dofs())
+        n_fixed = len(dofs) - len(cls.equations) - 1
+        return [
+            (i, o, *f)
+            for i, o in itertools.permutations(dofs, 2)
+            for f in itertools.combinations([d for d in dofs if d not in (i, o)], n_fixed)
+        ]
+
+    @classmethod
+    def evaluate_configurations(cls, configs=None, **geometry):
+        """Ratios of many drive configurations at once, for (arrays of) geometric variables
+
+        The equations are solved once per geometry, for a basis of all motions they permit;
+        the ratio of each configuration then follows from Cramer's rule on the rows of that basis
+
+        Parameters
+        ----------
+        configs: List[tuple], optional
+            (input, output, *fixed) dof names; all `configurations` by default
+
+        Returns
+        -------
+        configs: List[tuple]
+        ratios: ndarray, [n_configs, ...]
+            input/output ratio of each configuration; nan where a configuration is not admissible,
+            because its fixed dofs do not leave the output free to move
+        """
+        dofs = sorted(cls.dofs())
+        n, m = len(dofs), len(cls.equations)
+        k = n - m
+        if configs is None:
+            configs = cls.configurations()
+        configs = [tuple(c) for c in configs]
+
+        values = {key: np.asarray(v, dtype=float) for key, v in geometry.items()}
+        shape = np.broadcast_shapes(*[v.shape for v in values.values()])
+        A, _ = rational.linear_system(rational.compile_equations(cls.equations), dofs, values)
+        A = np.stack([np.stack([np.broadcast_to(a, shape) for a in row], axis=-1) for row in A], axis=-2)
+        # orthonormal basis of the null space, [..., n, k]
+        U = np.swapaxes(np.linalg.svd(A)[2][..., m:, :], -1, -2)
+
+        lookup = {d: i for i, d in enumerate(dofs)}
+        rows = np.array([[lookup[d] for d in c] for c in configs])    # [n_configs, k+1]
+        num = np.linalg.det(U[..., rows[:, [0] + list(range(2, k + 1))], :])
+        den = np.linalg.det(U[..., rows[:, 1:], :])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = num / den
+        ratios[np.abs(den) < 1e-12] = np.nan
+        return configs, np.moveaxis(ratios, -1, 0)
+
+    @property
+    def loaded(self):
+        """Dofs carrying load in this configuration; the input, the output, and those held by boundary conditions"""
+        import re
+        held = set(re.findall(r'\b[a-z_][a-zA-Z0-9_]*\b', ' '.join(self.aux)))
+        return {self.input, self.output} | held
 
     @property
     def ratio(self):
@@ -53,3 +204,12 @@ class GearKinematics:
         return f'{self.input}/{self.output}: {self.ratio}'
 
 
+def _broadcasting(func, names):
+    """Wrap a lambdified function, such that it takes keyword arguments,
+    and always returns a float array of the broadcast shape of its inputs;
+    even for ratios that do not depend on geometry at all"""
+    def wrapped(**geometry):
+        args = np.broadcast_arrays(*[np.asarray(geometry[n], dtype=float) for n in names])
+        shape = args[0].shape if args else ()
+        return np.asarray(func(*args), dtype=float) + np.zeros(shape)
+    return wrapped
@@ -1,35 +1,192 @@
-from numga.backend.numpy.context import NumpyContext
+import math
+from functools import lru_cache
+
 import numpy as np
 
 
-pga = NumpyContext('w0x+y+')
-x = pga.multivector.x
-y = pga.multivector.y
-w = pga.multivector.w
-xy = pga.multivector.xy
-wx = pga.multivector.wx
-wy = pga.multivector.wy
+@lru_cache(maxsize=None)
+def context():
+	"""The 2d PGA context; constructed on first use, since importing numga is expensive"""
+	from numga.backend.numpy.context import NumpyContext
+	pga = NumpyContext('w0x+y+')
+	assert pga.subspace.antivector().named_str == 'wx,wy,xy'
+	return pga
+
+
+def __getattr__(name):
+	"""Lazy module attributes for the context and its basis blades"""
+	if name == 'pga':
+		return context()
+	if name in ('x', 'y', 'w', 'xy', 'wx', 'wy'):
+		return getattr(context().multivector, name)
+	raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+class Rigid:
+	"""Planar rigid motion; a rotation by angle, followed by a translation by (tx, ty)
+
+	Closed-form equivalent of the rotation-plus-translation motors of the 2d PGA,
+	with the same operators; `a * b` applies b first, and `a >> b` is b conjugated by a.
+	Parameters may be arrays, representing a batch of motions; plain floats avoid numpy overhead.
+	Numga motors are accepted as operands, and converted through their point matrices.
+	"""
+	__slots__ = ('angle', 'tx', 'ty')
+
+	def __init__(self, angle=0.0, tx=0.0, ty=0.0):
+		self.angle, self.tx, self.ty = angle, tx, ty
+
+	@staticmethod
+	def _cs(angle):
+		if isinstance(angle, (int, float)):
+			return math.cos(angle), math.sin(angle)
+		return np.cos(angle), np.sin(angle)
+
+	@property
+	def batched(self):
+		scalar = (int, float)
+		return not (isinstance(self.angle, scalar) and isinstance(self.tx, scalar) and isinstance(self.ty, scalar))
+
+	@property
+	def t(self):
+		"""Translation, [..., 2]"""
+		return np.stack(np.broadcast_arrays(self.tx, self.ty), axis=-1)
+
+	@classmethod
+	def from_motor(cls, motor):
+		"""Convert a numga motor, or any other representation understood by `as_matrices`"""
+		if isinstance(motor, Rigid):
+			return motor
+		m = as_matrices(motor)
+		return cls(np.arctan2(m[..., 1, 2], m[..., 1, 1]), m[..., 0, 1], m[..., 0, 2])
+
+	def to_motor(self):
+		"""Equivalent numga motor"""
+		mv = context().multivector
+		return (1 + mv.wx*self.tx/-2 + mv.wy*self.ty/-2) * (mv.xy * np.sin(self.angle/-2) + np.cos(self.angle/-2))
+
+	@property
+	def matrix(self):
+		"""Point transformation matrix, [..., 3, 3], as produced by `as_matrices`"""
+		return rigid_matrices(self.angle, self.tx, self.ty)
+
+	def __mul__(self, other):
+		other = Rigid.from_motor(other)
+		c, s = self._cs(self.angle)
+		return Rigid(
+			self.angle + other.angle,
+			c * other.tx - s * other.ty + self.tx,
+			s * other.tx + c * other.ty + self.ty,
+		)
+	def __rmul__(self, other):
+		return Rigid.from_motor(other) * self
+
+	def __rshift__(self, other):
+		other = Rigid.from_motor(other)
+		c, s = self._cs(self.angle)
+		co, so = self._cs(other.angle)
+		return Rigid(
+			other.angle,
+			c * other.tx - s * other.ty + self.tx - (co * self.tx - so * self.ty),
+			s * other.tx + c * other.ty + self.ty - (so * self.tx + co * self.ty),
+		)
+	def __rrshift__(self, other):
+		return Rigid.from_motor(other) >> self
+
+	def reverse(self):
+		"""Inverse motion"""
+		c, s = self._cs(self.angle)
+		return Rigid(-self.angle, -(c * self.tx + s * self.ty), -(c * self.ty - s * self.tx))
+
+	def __call__(self, p):
+		"""Transform points p, [V, 2]; returning [..., V, 2] for a batch of motions"""
+		if self.batched:
+			return transform_batch(self.matrix, p)
+		c, s = self._cs(self.angle)
+		return p.dot(np.array([[c, s], [-s, c]])) + np.array([self.tx, self.ty])
+
+	def __repr__(self):
+		return f'Rigid(angle={self.angle}, tx={self.tx}, ty={self.ty})'
 
 
 def rotor(angle):
-	return xy * np.sin(angle/-2) + np.cos(angle/-2)
+	return Rigid(angle)
 
 
 def translator(tx, ty):
-	return 1 + wx*tx/-2 + wy*ty/-2
+	return Rigid(0.0, tx, ty)
 
 
 # # god this is so janky... need to add custom subspace ordering to numga to get rid of these signs
 signs = 1 - (np.arange(9).reshape(3,3)%2)*2
-assert pga.subspace.antivector().named_str == 'wx,wy,xy'
 def as_matrix(motor):
-	return motor.sandwich(pga.subspace.antivector()).kernel
+	return motor.sandwich(context().subspace.antivector()).kernel
 def transform(motor, p):
 	"""Optimized sandwich implementation for point transformation, eliminating intermediaries"""
+	if isinstance(motor, Rigid):
+		return motor(p)
 	m = (as_matrix(motor) *signs)[::-1,::-1]
 	return p.dot(m[1:, 1:]) + m[0:1, 1:]
 
 
+def as_matrices(motors):
+	"""Point transformation matrices of a sequence of motors, or of a single batched motor
+
+	Returns
+	-------
+	ndarray, [..., 3, 3]
+		homogeneous matrices acting on row vectors [1, x, y], as used by `transform_batch`
+	"""
+	if isinstance(motors, (list, tuple)):
+		return np.stack([as_matrices(m) for m in motors])
+	if isinstance(motors, Rigid):
+		return motors.matrix
+	return (as_matrix(motors) * signs)[..., ::-1, ::-1]
+
+
+def rigid_matrices(angle, tx=0, ty=0):
+	"""Point transformation matrices of rotations by angle, followed by translations by (tx, ty);
+	equivalent to `translator(tx, ty) * rotor(angle)`, for broadcasting arrays of parameters
+
+	Returns
+	-------
+	ndarray, [..., 3, 3]
+	"""
+	angle, tx, ty = np.broadcast_arrays(*[np.asarray(a, dtype=float) for a in (angle, tx, ty)])
+	c, s = np.cos(angle), np.sin(angle)
+	m = np.zeros(angle.shape + (3, 3))
+	m[..., 0, 0] = 1
+	m[..., 0, 1], m[..., 0, 2] = tx, ty
+	m[..., 1, 1], m[..., 1, 2] = c, s
+	m[..., 2, 1], m[..., 2, 2] = -s, c
+	return m
+
+
+def rigid_inverse(m):
+	"""Inverse of a stack of rigid point transformation matrices [..., 3, 3]; transposing the rotation,
+	without a general matrix inversion"""
+	out = np.zeros_like(m)
+	out[..., 0, 0] = 1
+	out[..., 1:, 1:] = np.swapaxes(m[..., 1:, 1:], -1, -2)
+	out[..., 0, 1:] = -np.einsum('...i,...ji->...j', m[..., 0, 1:], m[..., 1:, 1:])
+	return out
+
+
+def transform_batch(m, p):
+	"""Apply a stack of transformation matrices to one vertex array, in a single broadcast matmul
+
+	Parameters
+	----------
+	m: ndarray, [..., 3, 3]
+		from `as_matrices` or `rigid_matrices`
+	p: ndarray, [V, 2]
+
+	Returns
+	-------
+	ndarray, [..., V, 2]
+	"""
+	return p @ m[..., 1:, 1:] + m[..., None, 0, 1:]
+
+
 def test_pga():
 	from pygeartrain.core.profiles import epi_hypo_gear
 	from pygeartrain.core.profiles import Profile, circle
@@ -38,4 +195,4 @@ def test_pga():
 	m = translator(1, 2) * rotor(0.1)
 	(gear>> m).plot()
 	import matplotlib.pyplot as plt
-	plt.show()
\ No newline at end of file
+	plt.show()
@@ -1,49 +1,140 @@
 import numpy as np
 
-from pycomplex.complex.cubical import ComplexCubical1Euclidian2
-
+from pygeartrain.core.cache import profile_cache
 from pygeartrain.core.pga import transform
 
 
-class Profile(ComplexCubical1Euclidian2):
+class Profile:
+    """One or more closed polylines, stored as a single vertex array with implicit connectivity
+
+    Loop i consists of vertices[offsets[i]:offsets[i+1]], each connected to the next,
+    and the last back to the first.
+    """
+    __slots__ = ('vertices', 'offsets')
+
+    def __init__(self, vertices, offsets=None):
+        self.vertices = vertices
+        self.offsets = np.array([0, len(vertices)]) if offsets is None else np.asarray(offsets)
+
+    @classmethod
+    def empty(cls, dtype=float):
+        return cls(vertices=np.empty((0, 2), dtype), offsets=np.zeros(1, int))
+
+    @classmethod
+    def from_points(cls, p, dtype=None):
+        """Single closed loop through the points p, [n, 2]"""
+        return cls(vertices=np.asarray(p, dtype=dtype))
 
     @classmethod
-    def empty(cls):
+    def concat(cls, profiles):
+        offsets = np.cumsum([0] + [len(a.vertices) for a in profiles])
+        dtype = np.result_type(*[a.vertices for a in profiles]) if profiles else float
         return cls(
-            vertices=np.zeros((1, 2), float),
-            cubes=np.empty((0, 2), int)
+            vertices=np.concatenate([np.empty((0, 2), dtype)]+[a.vertices for a in profiles], axis=0),
+            offsets=np.concatenate([[0]] + [a.offsets[1:] + o for a, o in zip(profiles, offsets)])
         )
+
+    def copy(self, vertices=None):
+        return type(self)(
+            vertices=self.vertices.copy() if vertices is None else vertices,
+            offsets=self.offsets
+        )
+
+    def astype(self, dtype):
+        """Copy with vertices stored as dtype; float32 halves memory, at the cost of precision"""
+        return self.copy(vertices=self.vertices.astype(dtype))
+
+    @property
+    def loops(self):
+        """List of vertex arrays, one per closed loop"""
+        return [self.vertices[a:b] for a, b in zip(self.offsets[:-1], self.offsets[1:])]
+
+    @property
+    def edges(self):
+        """Vertex index pairs, [n_edges, 2], of all line segments"""
+        v = np.arange(len(self.vertices))
+        start = np.repeat(self.offsets[:-1], np.diff(self.offsets))
+        last = np.repeat(self.offsets[1:] - 1, np.diff(self.offsets))
+        return np.array([np.where(v == start, last, v - 1), v]).T
+
     @property
     def limit(self):
-        try:
-            return np.max(np.linalg.norm(self.vertices, axis=1))
-        except:
+        if len(self.vertices) == 0:
             return 0
+        return np.max(np.linalg.norm(self.vertices, axis=-1))
 
-    @classmethod
-    def concat(cls, profiles):
-        es = [a.topology.elements[-1] for a in profiles]
-        offsets = np.cumsum([0] + [len(e) for e in es])
-        return cls(
-            vertices=np.concatenate([np.empty((0, 2), float)]+[a.vertices for a in profiles], axis=0),
-            cubes=np.concatenate([np.empty((0, 2), int)]+[e + o for e, o in zip(es, offsets)], axis=0)
-        )
+    def scale(self, s):
+        return self.copy(vertices=self.vertices * s)
 
-    def plot(self, *args, **kwargs):
-        return super(Profile, self).plot(*args, plot_vertices=False, **kwargs)
+    def translate(self, t):
+        return self.copy(vertices=self.vertices + t)
 
+    def transform(self, m):
+        """Apply the linear map m, [2, 2], to the vertices as row vectors"""
+        return self.copy(vertices=np.dot(self.vertices, m).astype(self.vertices.dtype, copy=False))
 
     def __rshift__(self, motor):
-        return self.copy(vertices=transform(motor, self.vertices))
+        return self.copy(vertices=transform(motor, self.vertices).astype(self.vertices.dtype, copy=False))
     def __lshift__(self, motor):
-        return self.copy(vertices=transform(motor.reverse(), self.vertices))
+        return self.copy(vertices=transform(motor.reverse(), self.vertices).astype(self.vertices.dtype, copy=False))
+
+    def closed(self):
+        """Vertices of all loops, each repeating its first vertex and followed by a nan row;
+        suitable for drawing all loops in a single line plot"""
+        vertex, separator = self.closed_index()
+        out = self.vertices[vertex].astype(float)
+        out[separator] = np.nan
+        return out
+
+    def closed_index(self):
+        """Vertex index of each row of `closed`, and the mask of its nan separator rows;
+        which depend only on the offsets, and may be reused for any transformed copy"""
+        n = np.diff(self.offsets)
+        n = n[n > 0]
+        starts = np.cumsum(np.concatenate([[0], n]))[:-1]
+        idx = np.arange(n.sum() + 2 * len(n))
+        # map each output row to a vertex index; closing rows wrap to the loop start, separator rows are masked
+        loop = np.repeat(np.arange(len(n)), n + 2)
+        local = idx - np.repeat(starts + 2 * np.arange(len(n)), n + 2)
+        vertex = starts[loop] + np.where(local >= n[loop], 0, local)
+        return vertex, local == n[loop] + 1
+
+    def plot(self, ax=None, **kwargs):
+        if ax is None:
+            import matplotlib.pyplot as plt
+            ax = plt.gca()
+        return ax.plot(*self.closed().T, **kwargs)
+
+    def to_complex(self):
+        """Convert to a pycomplex cubical complex"""
+        from pycomplex.complex.cubical import ComplexCubical1Euclidian2
+        return ComplexCubical1Euclidian2(vertices=self.vertices, cubes=self.edges)
 
     @classmethod
-    def from_points(cls, p):
-
-        v = np.arange(len(p))
-        cubes = np.array([np.roll(v, 1), v]).T
-        return cls(vertices=p, cubes=cubes)
+    def from_complex(cls, complex):
+        """Convert from a pycomplex 1-complex, consisting of closed loops"""
+        vertices = complex.vertices
+        cubes = complex.topology.elements[-1]
+        succ = np.full(len(vertices), -1)
+        succ[cubes[:, 0]] = cubes[:, 1]
+        # fast path; every loop is already stored contiguously, in order
+        v = np.arange(len(vertices))
+        ends = np.flatnonzero(succ != v + 1)
+        starts = np.concatenate([[0], ends[:-1] + 1])
+        if len(cubes) == len(vertices) and np.array_equal(succ[ends], starts):
+            return cls(vertices=vertices, offsets=np.concatenate([[0], ends + 1]))
+        # general case; trace the loops
+        order, offsets = [], [0]
+        visited = np.zeros(len(vertices), bool)
+        for s in np.flatnonzero(succ >= 0):
+            i = s
+            while not visited[i]:
+                visited[i] = True
+                order.append(i)
+                i = succ[i]
+            if len(order) > offsets[-1]:
+                offsets.append(len(order))
+        return cls(vertices=vertices[order], offsets=np.array(offsets))
 
 
 # def ring(c):
@@ -54,34 +145,86 @@ class Profile(ComplexCubical1Euclidian2):
 
 
 def rotation(a):
+    """Rotation matrix, or stack of rotation matrices for an array of angles"""
     c, s = np.cos(a), np.sin(a)
-    return np.array([[c, s], [-s, c]])
+    return np.moveaxis(np.array([[c, s], [-s, c]]), (0, 1), (-2, -1))
+
+
+def adaptive_parameters(curve, t0, t1, tolerance, endpoint=True, oversample=4096):
+    """Parameter values along a curve, placed by curvature such that the chord error is about tolerance
 
+    A chord of length L across an arc of curvature k deviates from it by about k L^2 / 8;
+    so each dense piece of the curve, of length ds and turning angle da,
+    requires sqrt(da ds / (8 tolerance)) segments
 
-def trochoid_part(R, r, s, res, endpoint=False):
+    Parameters
+    ----------
+    curve: callable
+        maps an array of parameter values to an [n, 2] array of points
+    t0, t1: float
+        parameter range
+    tolerance: float
+        maximum distance between the curve and its polyline approximation
+    endpoint: bool
+        whether to include t1
+    oversample: int
+        number of dense segments used to estimate curvature
+
+    Returns
+    -------
+    ndarray, [n], float
+    """
+    t = np.linspace(t0, t1, oversample + 1)
+    d = np.diff(curve(t), axis=0)
+    ds = np.linalg.norm(d, axis=1)
+    heading = np.unwrap(np.arctan2(d[:, 1], d[:, 0]))
+    # split the turning at each dense vertex over its two adjacent segments; extrapolating at the ends
+    turn = np.abs(np.diff(heading)) / 2
+    turn = np.concatenate([turn[:1], turn, turn[-1:]])
+    da = turn[1:] + turn[:-1]
+    w = np.concatenate([[0], np.cumsum(np.sqrt(da * ds / (8 * tolerance)))])
+    n = max(int(np.ceil(w[-1])), 2)
+    a = np.interp(np.linspace(0, w[-1], n + 1), w, t)
+    return a if endpoint else a[:-1]
+
+
+def trochoid_part(R, r, s, res, endpoint=False, tolerance=None):
+    """Single tooth section of a trochoid
+
+    Sampled uniformly with `int(r * res)` points, or adaptively to the given chord-error tolerance
+    """
     # r = R / N
     N = R / r
-    a = np.linspace(0, 2*np.pi/N, int(r * res), endpoint=endpoint)
-    b = (R+r*s) / r * a * s
 
-    q = [[np.cos(a), np.cos(b)], [np.sin(a), np.sin(b)]]
-    return np.dot([(R+r*s), -r*s], q).T
+    def curve(a):
+        b = (R+r*s) / r * a * s
+        q = [[np.cos(a), np.cos(b)], [np.sin(a), np.sin(b)]]
+        return np.dot([(R+r*s), -r*s], q).T
 
+    if tolerance is None:
+        a = np.linspace(0, 2*np.pi/N, int(r * res), endpoint=endpoint)
+    else:
+        a = adaptive_parameters(curve, 0, 2*np.pi/N, tolerance, endpoint=endpoint)
+    return curve(a)
 
-def epitrochoid(a: float, q: int, d: float, N=2000):
-    b = a / q
-    k = d / b
-    t = np.linspace(0, np.pi*2, N)
-    x = b * ((q + 1) * np.cos(t) - k * np.cos((q+1)*t))
-    y = b * ((q + 1) * np.sin(t) - k * np.sin((q+1)*t))
 
+def epitrochoid(a: float, q: int, d: float, N=2000, tolerance=None):
+    b = a / q
     q = (a + b) / b
-    x = (a + b) * np.cos(t) - d * np.cos(q*t)
-    y = (a + b) * np.sin(t) - d * np.sin(q*t)
-    return np.array([x, y]).T
 
+    def curve(t):
+        x = (a + b) * np.cos(t) - d * np.cos(q*t)
+        y = (a + b) * np.sin(t) - d * np.sin(q*t)
+        return np.array([x, y]).T
+
+    if tolerance is None:
+        t = np.linspace(0, np.pi*2, N)
+    else:
+        t = adaptive_parameters(curve, 0, np.pi*2, tolerance, oversample=max(N, 4096))
+    return curve(t)
 
-def hypotrochoid(a: float, q: int, d: float):
+
+def hypotrochoid(a: float, q: int, d: float, N=500, tolerance=None):
     """
     where a is the radius of the base circle,
     b = a / q that of the rolling circle,
@@ -89,21 +232,25 @@ def hypotrochoid(a: float, q: int, d: float):
     """
     # a = a - 0.6
     b = a / q
-    k = d / b
+    # k = d / b
     # k = 0.6
-    t = np.linspace(0, np.pi*2, 500)
     # x = b * ((q - 1) * np.cos(t) + k * np.cos((q-1)*t))
     # y = b * ((q - 1) * np.sin(t) - k * np.sin((q-1)*t))
-
     q = (a - b) / b
-    x = (a + b) * np.cos(t) + d * np.cos(q*t)
-    y = (a + b) * np.sin(t) - d * np.sin(q*t)
 
-    return np.array([x, y]).T
+    def curve(t):
+        x = (a + b) * np.cos(t) + d * np.cos(q*t)
+        y = (a + b) * np.sin(t) - d * np.sin(q*t)
+        return np.array([x, y]).T
 
+    if tolerance is None:
+        t = np.linspace(0, np.pi*2, N)
+    else:
+        t = adaptive_parameters(curve, 0, np.pi*2, tolerance, oversample=max(N, 4096))
+    return curve(t)
 
-def sinusoid(n_teeth: int, slope=1/10, amplitude=None, pitch_radius: float=1.0, n_points=2000, fb=0):
-    a = np.linspace(0, np.pi * 2, n_points)
+
+def sinusoid(n_teeth: int, slope=1/10, amplitude=None, pitch_radius: float=1.0, n_points=2000, fb=0, tolerance=None):
     if amplitude is None:
         tooth_length = pitch_radius / n_teeth
         amplitude = tooth_length * slope
@@ -112,19 +259,25 @@ def sinusoid(n_teeth: int, slope=1/10, amplitude=None, pitch_radius: float=1.0,
     # add flank bias; offset with q**2?
     #  needs to be flipped for interior gears
 
-    q = np.sin(n_teeth * a)
-    qs = q*q
-    q2 = qs * np.sign(q)
-
     # positive values make it more sawtoothy; negative values more snub
     # more snub gives more clearance, and less urethane consumption
     # but a lowering effect on skipping torque
     fb2 = 0.25
     fb2 = 0.1
 
-    x = (pitch_radius + amplitude * (q + fb * qs + fb2 * q2)) * np.cos(a)
-    y = (pitch_radius + amplitude * (q + fb * qs + fb2 * q2)) * np.sin(a)
-    return np.array([x, y]).T
+    def curve(a):
+        q = np.sin(n_teeth * a)
+        qs = q*q
+        q2 = qs * np.sign(q)
+        x = (pitch_radius + amplitude * (q + fb * qs + fb2 * q2)) * np.cos(a)
+        y = (pitch_radius + amplitude * (q + fb * qs + fb2 * q2)) * np.sin(a)
+        return np.array([x, y]).T
+
+    if tolerance is None:
+        a = np.linspace(0, np.pi * 2, n_points)
+    else:
+        a = adaptive_parameters(curve, 0, np.pi * 2, tolerance, oversample=max(n_points, 4096))
+    return curve(a)
 
 
 def involute(n_teeth, pressure_angle, pitch_radius):
@@ -147,9 +300,13 @@ def involute(n_teeth, pressure_angle, pitch_radius):
     return np.array([x, y]).T * base_radius
 
 
-def epi_hypo_gear(R, N, f, res):
+@profile_cache.memoize
+def epi_hypo_gear(R, N, f, res, tolerance=None):
     """compound gear of alternating epi and hypo curves
 
+    Results are kept in `profile_cache`,
+    so the returned profile is shared and its vertices are read-only
+
     Parameters
     ----------
     R: float
@@ -160,17 +317,22 @@ def epi_hypo_gear(R, N, f, res):
         fraction of epi-vs-hypo
     res: int
         number of vertices per curve-section
+    tolerance: float, optional
+        if given, vertices are placed by curvature to this chord-error tolerance instead,
+        and res is ignored
     """
     # return circle(R)
     r = R / N
     t = 2*np.pi/N
-    p = trochoid_part(R, r * f, +1, res=res)
-    n = trochoid_part(R, r * (1 - f), -1, res=res)
+    p = trochoid_part(R, r * f, +1, res=res, tolerance=tolerance)
+    n = trochoid_part(R, r * (1 - f), -1, res=res, tolerance=tolerance)
     p = np.dot(p, rotation(-t*f/2))
     n = np.dot(n, rotation(t*f/2))
     # n = np.dot(n, rotation(t*f))
     u = np.concatenate([p, n], axis=0)
-    c = np.concatenate([np.dot(u, rotation(t*i)) for i in range(N)], axis=0)
+    # rotate single tooth into all N positions in one broadcast product
+    c = np.einsum('vi,nij->nvj', u, rotation(t * np.arange(N))).reshape(-1, 2)
+    c.setflags(write=False)
     return Profile.from_points(c)
 
 
@@ -181,32 +343,32 @@ def buffer(complex, r):
     return Profile.from_points(coords[::-1])
 
 
-def hypo_gear(R, N, f=1):
+def hypo_gear(R, N, f=1, tolerance=None):
     """
     References
     ----------
     https://www.researchgate.net/publication/303053954_Specific_Sliding_of_Trochoidal_Gearing_Profile_in_the_Gerotor_Pumps
     """
-    return Profile.from_points(hypotrochoid(R, N, f))
+    return Profile.from_points(hypotrochoid(R, N, f, tolerance=tolerance))
 
-def hypo_gear_offset(R, N, b, f=1):
-    return buffer(hypo_gear(R, N, f), b)
+def hypo_gear_offset(R, N, b, f=1, tolerance=None):
+    return buffer(hypo_gear(R, N, f, tolerance=tolerance), b)
 
-def epi_gear(R, N, f=1):
+def epi_gear(R, N, f=1, tolerance=None):
     """
     References
     ----------
     https://www.researchgate.net/publication/303053954_Specific_Sliding_of_Trochoidal_Gearing_Profile_in_the_Gerotor_Pumps
     """
-    return Profile.from_points(epitrochoid(R, N, f))
+    return Profile.from_points(epitrochoid(R, N, f, tolerance=tolerance))
 
-def epi_gear_offset(R, N, b, f=1):
+def epi_gear_offset(R, N, b, f=1, tolerance=None):
     """
     References
     ----------
     https://www.researchgate.net/publication/303053954_Specific_Sliding_of_Trochoidal_Gearing_Profile_in_the_Gerotor_Pumps
     """
-    return buffer(epi_gear(R, N, f), b)
+    return buffer(epi_gear(R, N, f, tolerance=tolerance), b)
 
 
 # def concat(geo):
@@ -218,10 +380,10 @@ def epi_gear_offset(R, N, b, f=1):
 #     )
 
 
-def make_pins(N, R, r):
-    pin = circle(r)
+def make_pins(N, R, r, tolerance=None):
+    pin = circle(r, tolerance=tolerance)
     return Profile.concat([pin.translate([R, 0]).transform(rotation(i / N * 2 * np.pi)) for i in range(N)])
 
 
-def circle(R, N=100):
-    return Profile.from_points(sinusoid(1, 0, 0, R, n_points=N))
+def circle(R, N=100, tolerance=None):
+    return Profile.from_points(sinusoid(1, 0, 0, R, n_points=N, tolerance=tolerance))
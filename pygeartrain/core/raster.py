@@ -0,0 +1,183 @@
+"""Matplotlib-free rasterization of profiles into uint8 image arrays
+
+Lines are anti-aliased by splatting samples spaced at most half a pixel apart along each segment,
+with bilinear weights, into a coverage buffer per colour; fills use an even-odd scanline rule.
+Both reduce to a handful of vectorized operations per colour, whatever the number of members.
+"""
+import numpy as np
+
+from pygeartrain.core.geometry import flatten
+
+
+# the single-letter colours of matplotlib
+COLORS = {
+    'b': (0, 0, 255), 'g': (0, 128, 0), 'r': (255, 0, 0), 'c': (0, 191, 191),
+    'm': (191, 0, 191), 'y': (191, 191, 0), 'k': (0, 0, 0), 'w': (255, 255, 255),
+}
+
+
+def to_rgb(color) -> np.ndarray:
+    """RGB triple in [0, 255] of a single-letter colour, or of a sequence of floats in [0, 1] or ints in [0, 255]"""
+    if isinstance(color, str):
+        return np.array(COLORS[color], dtype=float)
+    color = np.asarray(color, dtype=float)[:3]
+    return color * 255 if color.max() <= 1 else color
+
+
+def line_coverage(a, b, shape, linewidth=1.0) -> np.ndarray:
+    """Anti-aliased coverage of line segments, [H, W], in [0, 1]
+
+    Parameters
+    ----------
+    a, b: ndarray, [E, 2]
+        start and end points of the segments, in pixel coordinates (x right, y down),
+        with pixel centres at half-integers
+    shape: (H, W)
+    linewidth: float
+        in pixels
+    """
+    H, W = shape
+    d = b - a
+    length = np.sqrt((d * d).sum(axis=1))
+    counts = np.maximum(1, np.ceil(length * 2)).astype(int)
+    segment = np.repeat(np.arange(len(a)), counts)
+    k = np.arange(len(segment)) - np.repeat(np.cumsum(counts) - counts, counts)
+    t = (k + 0.5) / counts[segment]
+    p = a[segment] + d[segment] * t[:, None] - 0.5
+    w = (length / counts * linewidth)[segment]
+
+    i = np.floor(p).astype(int)
+    f = p - i
+    # the four pixels around each sample, [4, S]
+    x = i[:, 0] + np.array([[0], [1], [0], [1]])
+    y = i[:, 1] + np.array([[0], [0], [1], [1]])
+    fx, fy = f[:, 0], f[:, 1]
+    weight = w * np.stack([(1 - fx) * (1 - fy), fx * (1 - fy), (1 - fx) * fy, fx * fy])
+    inside = (x >= 0) & (x < W) & (y >= 0) & (y < H)
+    coverage = np.bincount(y[inside] * W + x[inside], weight[inside], minlength=H * W)
+    return np.minimum(coverage, 1).reshape(H, W)
+
+
+def fill_mask(a, b, shape, group=None) -> np.ndarray:
+    """Pixels with their centres inside closed loops of edges by the even-odd rule, [H, W] bool
+
+    Parameters
+    ----------
+    a, b: ndarray, [E, 2]
+        start and end points of all edges of one or more closed loops, in pixel coordinates
+    shape: (H, W)
+    group: ndarray, [E], optional
+        group of each edge; the even-odd rule applies within each group,
+        and the mask is the union over groups, such as over overlapping profiles
+    """
+    H, W = shape
+    lo, hi = np.minimum(a[:, 1], b[:, 1]), np.maximum(a[:, 1], b[:, 1])
+    # pixel rows, with centres at r + 0.5, crossed by each edge; half-open to count shared vertices once
+    first = np.clip(np.ceil(lo - 0.5), 0, H).astype(int)
+    last = np.clip(np.ceil(hi - 0.5), 0, H).astype(int)
+    counts = last - first
+    edge = np.repeat(np.arange(len(a)), counts)
+    row = np.arange(len(edge)) - np.repeat(np.cumsum(counts) - counts, counts) + first[edge]
+    y = row + 0.5
+    t = (y - a[edge, 1]) / (b[edge, 1] - a[edge, 1])
+    x = a[edge, 0] + t * (b[edge, 0] - a[edge, 0])
+    order = np.lexsort((x, row) if group is None else (x, row, group[edge]))
+    row, x = row[order], x[order]
+    # consecutive crossings of a row pair up into spans, toggled on and off in a difference image
+    column = np.clip(np.ceil(x - 0.5), 0, W).astype(int)
+    diff = np.zeros((H, W + 1), int)
+    np.add.at(diff, (row[0::2], column[0::2]), 1)
+    np.add.at(diff, (row[1::2], column[1::2]), -1)
+    return np.cumsum(diff[:, :-1], axis=1) > 0
+
+
+class Rasterizer:
+    """Renders the members of a geometry, in the colours of `GearGeometry.colors`,
+    straight into uint8 images; without text, axes, or any other matplotlib artists"""
+
+    def __init__(self, geometry, size=(214, 160), linewidth=1.0, fill=None, background='w'):
+        """
+        Parameters
+        ----------
+        size: (W, H)
+            of the image in pixels; the square of plot bounds is centred, and fit to it
+        fill: float, optional
+            opacity of the member interiors; outlines only by default.
+            Internal members, such as ring gears, have their material outside their loops, and are not filled
+        """
+        self.geometry = geometry
+        self.shape = size[1], size[0]
+        self.linewidth = linewidth
+        self.fill = fill
+        self.background = to_rgb(background)
+        self.scale = min(size) / 2 / geometry.limit
+        members = flatten(geometry.arrange(0.0))
+        # first and last vertex of each loop per member, shared by every frame
+        self.loops = {}
+        for i, c in enumerate(geometry.colors):
+            if c is not None and len(members[i].vertices):
+                o = members[i].offsets
+                o = o[np.flatnonzero(np.diff(o))[:, None] + [0, 1]]
+                self.loops[i] = o[:, 0], o[:, 1] - 1
+        # segment buffers per member selection, reused by every frame
+        self.buffers = {}
+        groups = {}
+        for i, c in enumerate(geometry.colors):
+            if i in self.loops:
+                groups.setdefault(c, []).append(i)
+        self.groups = [(to_rgb(c), g) for c, g in groups.items()]
+        internal = set(geometry.internal)
+        self.filled = [[i for i in g if i not in internal] for _, g in self.groups]
+
+    def segments(self, members, indices):
+        """Start and end points in pixel coordinates of all edges of the given members, [E, 2] each,
+        and the position in indices of the member of each edge, [E]
+
+        Edge k of a member runs from the vertex before k in its loop to vertex k, so the end points are
+        the vertices themselves, and the start points the same shifted by one. Both are written by slices
+        into buffers owned by the rasterizer, which are overwritten by the next call for the same members
+        """
+        H, W = self.shape
+        key = tuple(indices)
+        if key not in self.buffers:
+            counts = [len(members[i].vertices) for i in indices]
+            self.buffers[key] = np.empty((2, sum(counts), 2)), np.repeat(np.arange(len(counts)), counts)
+        points, group = self.buffers[key]
+        a, b = points
+        k = 0
+        for i in indices:
+            v = members[i].vertices
+            first, last = self.loops[i]
+            n = len(v)
+            b[k:k + n] = v
+            a[k + 1:k + n] = v[:-1]
+            # loops close from their last vertex back to their first
+            a[k + first] = v[last]
+            k += n
+        points[..., 0] *= self.scale
+        points[..., 0] += W / 2
+        points[..., 1] *= -self.scale
+        points[..., 1] += H / 2
+        return a, b, group
+
+    def __call__(self, phase) -> np.ndarray:
+        """Frame at the given phase, [H, W, 3] uint8"""
+        members = flatten(self.geometry.arrange(phase))
+        # planar channels, [3, H, W], for contiguous compositing
+        image = np.empty((3,) + self.shape)
+        image[...] = self.background[:, None, None]
+        if self.fill:
+            for (color, _), filled in zip(self.groups, self.filled):
+                if not filled:
+                    continue
+                a, b, group = self.segments(members, filled)
+                mask = fill_mask(a, b, self.shape, group)
+                for c in range(3):
+                    image[c][mask] += self.fill * (color[c] - image[c][mask])
+        for color, group in self.groups:
+            a, b, _ = self.segments(members, group)
+            alpha = line_coverage(a, b, self.shape, self.linewidth)
+            for c in range(3):
+                image[c] += alpha * (color[c] - image[c])
+        return np.stack([image[c].astype(np.uint8) for c in range(3)], axis=-1)
+
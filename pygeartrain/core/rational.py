@@ -0,0 +1,148 @@
+"""Exact linear solves of kinematic systems with concrete geometries
+
+Kinematic equations are linear in their degrees of freedom, with coefficients
+that are (typically integer) expressions in the geometric variables.
+For concrete values, the coefficient matrix is obtained by plain evaluation of the equations,
+and solved either with `Fraction` arithmetic, or batched with fraction-free integer elimination.
+Neither path involves sympy.
+"""
+from fractions import Fraction
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+def compile_equations(equations: List[str]):
+    return [compile(e, '<equation>', 'eval') for e in equations]
+
+
+def linear_system(code, dofs: List[str], values: Dict):
+    """Coefficient matrix and right hand side of a set of compiled affine equations
+
+    Since each equation is of the form e(x) = A x - b,
+    e(0) gives -b, and e(unit_j) - e(0) the j-th column of A
+
+    Returns
+    -------
+    A: list of lists, [n_equations][n_dofs]
+    b: list, [n_equations]
+    """
+    def evaluate(c, unit):
+        namespace = {'__builtins__': {}, **values}
+        namespace.update({d: int(d == unit) for d in dofs})
+        return eval(c, namespace)
+
+    A, b = [], []
+    for c in code:
+        offset = evaluate(c, None)
+        A.append([evaluate(c, d) - offset for d in dofs])
+        b.append(-offset)
+    return A, b
+
+
+def fraction_solve(A, b) -> List[Fraction]:
+    """Exact Gauss-Jordan elimination of a full-rank, consistent system, in rational arithmetic"""
+    m, n = len(A), len(A[0])
+    M = [[Fraction(a) for a in row] + [Fraction(r)] for row, r in zip(A, b)]
+    row = 0
+    pivots = []
+    for col in range(n):
+        p = next((i for i in range(row, m) if M[i][col] != 0), None)
+        if p is None:
+            continue
+        M[row], M[p] = M[p], M[row]
+        pivot = M[row][col]
+        M[row] = [v / pivot for v in M[row]]
+        for i in range(m):
+            if i != row and M[i][col] != 0:
+                f = M[i][col]
+                M[i] = [v - f * w for v, w in zip(M[i], M[row])]
+        pivots.append(col)
+        row += 1
+    if len(pivots) < n:
+        raise ValueError('Kinematic system is underdetermined')
+    if any(M[i][n] != 0 for i in range(row, m)):
+        raise ValueError('Kinematic system is inconsistent')
+    return [M[i][n] for i in range(n)]
+
+
+def bareiss_det(M):
+    """Batched exact determinant by fraction-free Bareiss elimination
+
+    Parameters
+    ----------
+    M: ndarray, [..., n, n], integer or object dtype
+
+    Returns
+    -------
+    ndarray, [...], same dtype as M
+    """
+    M = np.array(M)     # work on a copy
+    n = M.shape[-1]
+    if n == 0:
+        return np.ones(M.shape[:-2], dtype=M.dtype)
+    sign = np.ones(M.shape[:-2], dtype=M.dtype)
+    prev = np.ones(M.shape[:-2], dtype=M.dtype)
+    idx = np.indices(M.shape[:-2])
+    for k in range(n - 1):
+        # partial pivoting on first nonzero entry; batches without any pivot have zero determinant
+        nonzero = M[..., k:, k] != 0
+        p = np.argmax(nonzero, axis=-1) + k
+        singular = ~nonzero.any(axis=-1)
+        swap = p != k
+        rows_k = M[(*idx, k)].copy()
+        M[(*idx, k)] = M[(*idx, p)]
+        M[(*idx, p)] = rows_k
+        sign = np.where(swap, -sign, sign)
+
+        pivot = M[..., k, k]
+        pivot = np.where(singular, 1, pivot)
+        M[..., k+1:, k+1:] = (
+            M[..., k+1:, k+1:] * pivot[..., None, None] -
+            M[..., k+1:, k:k+1] * M[..., k:k+1, k+1:]
+        ) // prev[..., None, None]
+        M[..., k+1:, k] = 0
+        M[singular] = 0
+        prev = pivot
+    return sign * M[..., n-1, n-1]
+
+
+def bareiss_solve(A, b) -> Tuple[np.ndarray, np.ndarray]:
+    """Batched exact solve of square integer systems via Cramer's rule on Bareiss determinants
+
+    Parameters
+    ----------
+    A: ndarray, [..., n, n], integer
+    b: ndarray, [..., n], integer
+
+    Returns
+    -------
+    numerators: ndarray, [..., n]
+    denominators: ndarray, [..., n]
+        Reduced such that denominators are positive; zero for singular systems
+        Arrays are int64 if intermediate values are guaranteed to fit, python ints otherwise
+    """
+    A = np.asarray(A)
+    b = np.asarray(b)
+    A, b = np.broadcast_arrays(A, b[..., None])
+    b = b[..., 0]
+    n = A.shape[-1]
+    # Hadamard bound on all minors; multiplication inside bareiss squares it
+    norms = np.linalg.norm(np.concatenate([A, b[..., None]], axis=-1).astype(float), axis=-1)
+    bound = np.prod(np.maximum(norms, 1), axis=-1)
+    dtype = np.int64 if np.all(bound ** 2 < 2.0 ** 62) else object
+
+    # stack A with each of its columns replaced by b
+    M = np.repeat(A[..., None, :, :], n + 1, axis=-3).astype(dtype)
+    for j in range(n):
+        M[..., j + 1, :, j] = b
+    dets = bareiss_det(M)
+    den = dets[..., :1]
+    num = dets[..., 1:]
+
+    g = np.gcd(num, den)
+    g = np.where(g == 0, 1, g)
+    s = np.where(den < 0, -1, 1)
+    num = num // g * s
+    den = np.broadcast_to(den // g * s, num.shape)
+    return num, den
@@ -2,10 +2,11 @@ from dataclasses import dataclass
 
 from functools import cached_property
 
+import numpy as np
+
+from pygeartrain.core.cache import profile_cache
 from pygeartrain.core.geometry import GearGeometry
 from pygeartrain.core.kinematics import GearKinematics
-from pygeartrain.core.profiles import *
-from pygeartrain.core.pga import rotor, translator
 
 
 class Cycloid(GearKinematics):
@@ -24,46 +25,67 @@ class CycloidGeometry(GearGeometry):
     f: float = 0.8  # cycloid depth; 1=full cycloid, 0 is circle
     cycloid: str ='epi'
     O: int = 0      # output pins
+    tolerance: float = None     # chord-error tolerance of the profiles; uniform sampling if None
 
     @classmethod
-    def create(cls, kinematics, P, cycloid='epi', O=0):
+    def create(cls, kinematics, P, cycloid='epi', O=0, tolerance=None):
         geometry = {'P': P}
         return cls(
             kinematics=kinematics,
             geometry=geometry,
             P=P, cycloid=cycloid,
-            O=O,
+            O=O, tolerance=tolerance,
         )
 
     @cached_property
     def generate_profiles(self):
-        return generate_profiles(self.P, self.f, self.b, self.cycloid, O=self.O)
+        return generate_profiles(self.P, self.f, self.b, self.cycloid, O=self.O, tolerance=self.tolerance)
+
+    @property
+    def symmetries(self):
+        # the disc orbits with the carrier, and spins with p
+        s = [{'r': self.P + 1}, {'p': self.P}, {'c': 1}]
+        return s + [{'p': self.O}] if self.O else s
+
+    @property
+    def meshes(self):
+        # disc against ring
+        return [(1, 0)]
+
+    @property
+    def load_paths(self):
+        # the disc rides the crank
+        return [[(1, 0) if self.kinematics.output == 'r' else (0, 1)]]
+
+    @property
+    def internal(self):
+        return (0,) if self.cycloid == 'hypo' else ()
 
     def arrange(self, phase):
         r = self.phases(phase)
         return arrange(self.generate_profiles, r['p'], r['r'], r['c'])
 
-    def _plot(self, ax, phase):
-        r, p, s, o = self.arrange(phase)
-        p.plot(ax=ax, color='r')
-        r.plot(ax=ax, color='r')
-        s.plot(ax=ax, color='g')
-        o.plot(ax=ax, color='k')
+    @property
+    def colors(self):
+        return ['r', 'r', 'g', 'k']
 
 
 
-def generate_profiles(P, f, b, cycloid, offset=0, s=1, scale=1, O=0):
+@profile_cache.memoize
+def generate_profiles(P, f, b, cycloid, offset=0, s=1, scale=1, O=0, tolerance=None):
+    from pygeartrain.core.profiles import Profile, epi_gear_offset, hypo_gear, hypo_gear_offset, make_pins
+    from pygeartrain.core.pga import rotor
     R = P + 1
     e = 1 * f * s
 
     if cycloid == 'epi':
-        p = epi_gear_offset(P*s, P, b=-b, f=f*s)
+        p = epi_gear_offset(P*s, P, b=-b, f=f*s, tolerance=tolerance)
         # carrier output pin holes
-        p = Profile.concat([p, make_pins(O, R*s/2, b*s)])
-        r = make_pins(R, R*s, b)
+        p = Profile.concat([p, make_pins(O, R*s/2, b*s, tolerance=tolerance)])
+        r = make_pins(R, R*s, b, tolerance=tolerance)
     elif cycloid == 'hypo':
-        p = make_pins(P, (P+2)*s, b)
-        r = hypo_gear_offset(R*s, R, b=b, f=f*s)
+        p = make_pins(P, (P+2)*s, b, tolerance=tolerance)
+        r = hypo_gear_offset(R*s, R, b=b, f=f*s, tolerance=tolerance)
 
     if O:
         o = make_pins(O, R*s/2, (b+e)*s)  # carrier output pins
@@ -81,6 +103,7 @@ def generate_profiles(P, f, b, cycloid, offset=0, s=1, scale=1, O=0):
 
 
 def arrange(profiles, rp, rr, rc):
+    from pygeartrain.core.pga import rotor, translator
     r, p, s, o, e = profiles
 
     o = o >> rotor(rp)
@@ -8,10 +8,9 @@ from functools import cached_property
 from typing import Tuple
 
 from pygeartrain.core.kinematics import GearKinematics
-from pygeartrain.core.geometry import GearGeometry, flatten
+from pygeartrain.core.geometry import GearGeometry
 from pygeartrain import cycloid
 from pygeartrain import planetary
-from pygeartrain.core.profiles import Profile
 
 
 class NabtescoKinematics(GearKinematics):
@@ -52,21 +51,43 @@ class NabtescoGeometry(GearGeometry):
 
     @cached_property
     def generate_profiles(self):
+        from pygeartrain.core.profiles import Profile, circle, make_pins
         # we reuse planetary and cycloid functionality; just with small flourishes to the profiles
         scale=1.9
         b2 = 2.0
         C = cycloid.generate_profiles(self.L, self.f, self.b, cycloid='epi', scale=scale / self.L)
         r, p, s, o, e = C
-        p = Profile.concat([p, cycloid.make_pins(self.N, 1, b2*(self.b / self.L + 0*e) * scale)])   # add bearing holes into disc
+        p = Profile.concat([p, make_pins(self.N, 1, b2*(self.b / self.L + 0*e) * scale)])   # add bearing holes into disc
         C = r, p, s, o, e
 
         P = planetary.generate_profiles((1,)+self.G[1:], self.N, 0.5)
         r, p, s, c = P
-        p = Profile.concat([p, planetary.circle((self.b / self.L + e*0)*b2)]) # add wobbler bearing onto planets
+        p = Profile.concat([p, circle((self.b / self.L + e*0)*b2)]) # add wobbler bearing onto planets
         P = r, p, s, c
 
         return C, P
 
+    @property
+    def symmetries(self):
+        R, W, S = self.G
+        return [
+            {'r': self.L + 1}, {'l': self.L}, {'l': self.N}, {'w': 1},     # cycloid, with bearing holes
+            {'s': S}, {'w': W, 'o': R - W}, {'o': self.N},                  # planetary, with fixed ring
+        ]
+
+    @property
+    def meshes(self):
+        # disc against pin ring, and wobbler planets against the sun; the planetary ring is a dummy
+        return [(1, 0)] + [(5 + i, 5 + self.N) for i in range(self.N)]
+
+    @property
+    def load_paths(self):
+        # the disc is in series with each of the wobbler cranks, which share the load from the sun
+        loaded, out, s = self.kinematics.loaded, self.kinematics.output, 5 + self.N
+        disc = [(1, 0) if out == 'r' else (0, 1)] if 'r' in loaded else []
+        sun = lambda i: [(5 + i, s) if out == 's' else (s, 5 + i)] if 's' in loaded else []
+        return [disc + sun(i) for i in range(self.N)]
+
     def arrange(self, phase):
         C, P = self.generate_profiles
         r = self.phases(phase)
@@ -75,9 +96,7 @@ class NabtescoGeometry(GearGeometry):
             planetary.arrange(P, self.G, self.N, 0, r['w'], r['s'], r['o']),
         )
 
-    def _plot(self, ax, phase):
-        C, P = self.arrange(phase)
-        for c in C[:-2]:    # skip default cycloid wobbler and carrier
-            c.plot(ax=ax, color='r')
-        for p in flatten(P[1:]):    # skip default planet ring gear
-            p.plot(ax=ax, color='b')
+    @property
+    def colors(self):
+        # skip the default cycloid wobbler and carrier, and the default planet ring gear
+        return ['r', 'r', None, None] + [None] + ['b'] * (self.N + 2)
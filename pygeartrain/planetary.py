@@ -2,10 +2,11 @@ from dataclasses import dataclass
 from functools import cached_property
 from typing import Tuple
 
-from pygeartrain.core.geometry import GearGeometry, flatten
+import numpy as np
+
+from pygeartrain.core.cache import profile_cache
+from pygeartrain.core.geometry import GearGeometry
 from pygeartrain.core.kinematics import GearKinematics
-from pygeartrain.core.profiles import *
-from pygeartrain.core.pga import rotor, translator
 
 
 class Planetary(GearKinematics):
@@ -24,65 +25,119 @@ class PlanetaryGeometry(GearGeometry):
     G: Tuple[int, int, int]
     N: int      # number of planets
     b: float    # ratio of epi/hypo cycloid in the tooth profile
+    tolerance: float = None     # chord-error tolerance of the tooth profiles; uniform sampling if None
+    radius: float = 1.0         # carrier radius of the planets; or a sequence of N, one per planet
 
     @classmethod
-    def create(cls, kinematics, G, N, b=0.5):
+    def create(cls, kinematics, G, N, b=0.5, tolerance=None):
         geometry = dict(zip('RPS', G))
         return cls(
             kinematics=kinematics,
             geometry=geometry,
-            G=G, N=N, b=b
+            G=G, N=N, b=b, tolerance=tolerance,
         )
 
     @cached_property
     def generate_profiles(self, res=500):
-        return generate_profiles(self.G, self.N, self.b, res=res, show_carrier=False)
+        return generate_profiles(self.G, self.N, self.b, res=res, show_carrier=False, tolerance=self.tolerance)
+
+    @property
+    def symmetries(self):
+        R, P, S = self.G
+        # planets trade places under carrier rotation by 2pi/N, if their spin matches the next slot
+        return [{'r': R}, {'s': S}, {'p': P, 'c': R - P}, {'c': self.N}]
+
+    @property
+    def meshes(self):
+        return meshes(self.N)
+
+    @property
+    def load_paths(self):
+        # every planet carries load between the sun and the ring; the planets ride the carrier
+        out, s = self.kinematics.output, self.N + 1
+        return [
+            [(i, 0) if out == 'r' else (0, i), (i, s) if out == 's' else (s, i)]
+            for i in range(1, self.N + 1)
+        ]
+
+    @property
+    def internal(self):
+        return (0,)
 
     def arrange(self, phase):
         r = self.phases(phase)
         return arrange(
             self.generate_profiles, self.G, self.N,
-            r['r'], r['p'], r['s'], r['c'],
+            r['r'], r['p'], r['s'], r['c'], self.radius,
         )
 
     def _plot(self, ax, phase, col='b'):
-        for profile in flatten(self.arrange(phase)):
-            profile.plot(ax=ax, color=col)
+        return super()._plot(phase=phase, ax=ax, colors=[col] * (self.N + 3))
 
+    @property
+    def colors(self):
+        return ['b'] * (self.N + 3)
 
-# broken out as free functions for reusability in compound planetary
-def generate_profiles(G, N, b, res=500, offset=0, scale=1, show_carrier=False):
-    R,P,S = G
-    # scale planetaries to unit circle
-    f = (S + P) / scale
 
-    r = epi_hypo_gear(R/f, R, b, res) >> rotor(offset / R * np.pi)
-    p = epi_hypo_gear(P/f, P, b, res) >> rotor(offset / P * np.pi)
-    s = epi_hypo_gear(S/f, S, 1 - b, res) >> rotor(-offset / S * np.pi)
+# broken out as free functions for reusability in compound planetary
+def generate_profiles(G, N, b, res=500, offset=0, scale=1, show_carrier=False, tolerance=None):
+    from pygeartrain.core.profiles import Profile, hypo_gear
+    # tooth counts may be given as any sequence; as a tuple they key the profile cache
+    r, p, s = gear_profiles(tuple(G), b, res, offset, scale, tolerance)
     # optional carrier visualization
     if show_carrier:
         c = hypo_gear(N, N, f=0.5).scale(1/N)
     else:
         c = Profile.empty()
+    return r, p, s, c
+
+
+@profile_cache.memoize
+def gear_profiles(G, b, res=500, offset=0, scale=1, tolerance=None):
+    """Ring, planet and sun profiles; independent of the number of planets,
+    and shared between all geometries with equal parameters"""
+    from pygeartrain.core.profiles import epi_hypo_gear
+    from pygeartrain.core.pga import rotor
+    R,P,S = G
+    # scale planetaries to unit circle
+    f = (S + P) / scale
+
+    r = epi_hypo_gear(R/f, R, b, res, tolerance) >> rotor(offset / R * np.pi)
+    p = epi_hypo_gear(P/f, P, b, res, tolerance) >> rotor(offset / P * np.pi)
+    s = epi_hypo_gear(S/f, S, 1 - b, res, tolerance) >> rotor(-offset / S * np.pi)
     # rotate sun gear in even toothed planet case for correct meshing
     s = s >> rotor(np.pi / S * (((P+1) % 2)))
-    return r, p, s, c
+    return r, p, s
 
 
-def arrange(profiles, G, N, rr, rp, rs, rc):
-    """Take generated profiles and arrange them into a planetary with the proper phase rotations"""
+def meshes(N, offset=0):
+    """Ring-planet, planet-sun and neighbouring planet pairs, in the flattened order of `arrange`"""
+    planets = range(1, N + 1)
+    neighbours = [(i, i % N + 1) for i in planets] if N > 2 else [(1, 2)] if N == 2 else []
+    pairs = [(0, i) for i in planets] + [(i, N + 1) for i in planets] + neighbours
+    return [(a + offset, b + offset) for a, b in pairs]
+
+
+def arrange(profiles, G, N, rr, rp, rs, rc, radius=1.0):
+    """Take generated profiles and arrange them into a planetary with the proper phase rotations
+
+    The rotations may be arrays of shape [T], in which case all vertices gain a leading [T] axis.
+    The carrier radius may be an array of shape [N], to place each planet individually
+    """
+    from pygeartrain.core.pga import rotor, rigid_matrices, transform_batch
     rg, pg, sg, cg = profiles
     R, P, S = G
     rg = rg >> rotor(rr)
-    pg = pg >> rotor(rp)
     sg = sg >> rotor(rs)
     cg = cg >> rotor(rc)
 
-    # expand single planet into full ring of N
-    def motor(i):
-        a = 2 * np.pi * i / N   # rotation needed for placement along carrier
-        w = (1-R/P) * a         # rotation needed to maintain meshing along carrier
-        return (rotor(rc+a) >> translator(1, 0)) * rotor(w)
-    pgs = [pg >> motor(i) for i in range(N)]
+    # expand single planet into full ring of N, in a single batched transform
+    a = 2 * np.pi * np.arange(N) / N   # rotation needed for placement along carrier
+    w = (1-R/P) * a                     # rotation needed to maintain meshing along carrier
+    rp, rc = np.asarray(rp)[..., None], np.asarray(rc)[..., None]
+    radius = np.asarray(radius, dtype=float)
+    m = rigid_matrices(rp + w, radius * np.cos(rc + a), radius * np.sin(rc + a))
+    v = transform_batch(m, pg.vertices).astype(pg.vertices.dtype, copy=False)
+    pgs = [pg.copy(vertices=v[..., i, :, :]) for i in range(N)]
 
     return rg, pgs, sg, cg
@@ -0,0 +1,151 @@
+"""Design space search over compound planetary (Wolfram topology) tooth counts
+
+All stage pairs up to a tooth count limit are enumerated, filtered by vectorized assembly constraints,
+and ranked by an objective; the space is sharded over stage-1 candidates across a process pool
+"""
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from pygeartrain.core import assembly
+from pygeartrain.compound_planetary import CompoundPlanetary, CompoundPlanetaryGeometry
+
+
+def ratio_per_tooth(ratio, G1, G2):
+    """Reduction per total tooth count; a measure of how efficiently teeth are put to use"""
+    return np.abs(ratio) / (G1.sum(axis=-1) + G2.sum(axis=-1))
+
+
+def absolute_ratio(ratio, G1, G2):
+    return np.abs(ratio)
+
+
+objectives = {
+    'ratio_per_tooth': ratio_per_tooth,
+    'ratio': absolute_ratio,
+}
+
+
+@dataclass(frozen=True, order=True)
+class Candidate:
+    score: float
+    ratio: float
+    G1: Tuple[int, int, int]
+    G2: Tuple[int, int, int]
+    N: int
+
+    def create(self, kinematics, **kwargs) -> CompoundPlanetaryGeometry:
+        return CompoundPlanetaryGeometry.create(kinematics, self.G1, self.G2, self.N, **kwargs)
+
+
+def _search_shard(config, stages, rows, planets, objective, k, b, clearance, max_module_ratio,
+                  identical, min_ratio):
+    """Evaluate all pairs of stage-1 candidates in `rows` with all stage-2 candidates"""
+    G1 = stages[rows][:, None]
+    G2 = stages[None]
+    # trailing axis broadcasts over planet counts
+    R1, P1, S1 = np.moveaxis(G1, -1, 0)[..., None]
+    R2, P2, S2 = np.moveaxis(G2, -1, 0)[..., None]
+    N = np.asarray(planets)
+
+    # valid planet counts; when multiple apply we retain the largest for each pair of stages
+    valid = (
+        assembly.equal_spacing(R1, S1, N) & assembly.equal_spacing(R2, S2, N) &
+        assembly.planet_clearance(P1, S1, N, b, clearance) &
+        assembly.planet_clearance(P2, S2, N, b, clearance)
+    )
+    if identical:
+        valid &= assembly.identical_planets(R1, P1, R2, P2, N)
+    any_valid = valid.any(axis=-1)
+    best_N = N[len(N) - 1 - np.argmax(valid[..., ::-1], axis=-1)]
+
+    mask = any_valid & (assembly.module_ratio(P1, S1, P2, S2)[..., 0] <= max_module_ratio)
+    i, j = np.nonzero(mask)
+    g1, g2 = G1[i, 0], G2[0, j]
+
+    kinematics = CompoundPlanetary(*config)
+    geometry = {**dict(zip(['R1', 'P1', 'S1'], g1.T)), **dict(zip(['R2', 'P2', 'S2'], g2.T))}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = kinematics.evaluate(**geometry)[kinematics.input]
+        score = objective(ratio, g1, g2)
+    keep = np.isfinite(score) & (np.abs(ratio) >= min_ratio)
+    idx = np.flatnonzero(keep)
+    if len(idx) > k:
+        idx = idx[np.argpartition(-score[idx], k - 1)[:k]]
+    return [
+        Candidate(float(score[q]), float(ratio[q]), tuple(int(v) for v in g1[q]), tuple(int(v) for v in g2[q]),
+                  int(best_N[i[q], j[q]]))
+        for q in idx
+    ]
+
+
+def search(
+        limit: int,
+        kinematics: CompoundPlanetary = None,
+        planets: Sequence[int] = range(3, 13),
+        objective: Union[str, Callable] = 'ratio_per_tooth',
+        k: int = 20,
+        b: float = 0.5,
+        clearance: float = 0.0,
+        max_module_ratio: float = 2.0,
+        identical: bool = False,
+        min_ratio: float = 1.0,
+        processes: int = None,
+) -> List[Candidate]:
+    """Find the top-k compound planetaries with up to `limit` teeth on any gear
+
+    Parameters
+    ----------
+    limit: int
+        maximum tooth count of any gear
+    kinematics: CompoundPlanetary, optional
+        drive configuration to evaluate ratios for; sun-driven s1-r2-r1 by default
+    planets: sequence of int
+        planet counts to consider
+    objective: str or callable
+        key into `objectives`, or a function of (ratio, G1, G2) arrays returning scores; higher is better
+    k: int
+        number of candidates to return
+    b: float
+        epi/hypo profile ratio, which determines planet tip radius for neighbour clearance
+    clearance: float
+        additional required gap between neighbouring planet tips, relative to carrier radius
+    max_module_ratio: float
+        maximum ratio of tooth size between both stages sharing the carrier radius
+    identical: bool
+        if True, only accept designs where all compound planets are identical parts
+    min_ratio: float
+        minimum absolute ratio; excludes upgearing configurations
+    processes: int, optional
+        number of worker processes; defaults to all cores, 1 runs in-process
+
+    Returns
+    -------
+    List[Candidate]
+        sorted by descending score
+    """
+    if kinematics is None:
+        kinematics = CompoundPlanetary('s1', 'r2', 'r1')
+    if isinstance(objective, str):
+        objective = objectives[objective]
+    config = (kinematics.input, kinematics.output, *kinematics.aux)
+    stages = assembly.planetary_stages(limit)
+    planets = list(planets)
+    processes = processes or os.cpu_count() or 1
+
+    shards = np.array_split(np.arange(len(stages)), max(1, min(len(stages), processes * 4)))
+    args = [
+        (config, stages, rows, planets, objective, k, b, clearance, max_module_ratio, identical, min_ratio)
+        for rows in shards if len(rows)
+    ]
+    if processes == 1:
+        results = [_search_shard(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            results = list(pool.map(_search_shard, *zip(*args)))
+
+    return heapq.nlargest(k, (c for r in results for c in r))
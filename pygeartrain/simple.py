@@ -1,9 +1,9 @@
-from sympy.core.cache import cached_property
+from functools import cached_property
+
+import numpy as np
 
 from pygeartrain.core.geometry import GearGeometry
 from pygeartrain.core.kinematics import GearKinematics
-from pygeartrain.core.profiles import *
-from pygeartrain.core.pga import rotor, translator
 
 
 class SimpleGear(GearKinematics):
@@ -15,6 +15,8 @@ class SimpleGeometry(GearGeometry):
 
 	@cached_property
 	def generate_profiles(self, b=0.6, N=100):
+		from pygeartrain.core.profiles import epi_hypo_gear
+		from pygeartrain.core.pga import rotor
 		A = self.geometry['A']
 		B = self.geometry['B']
 
@@ -22,7 +24,20 @@ class SimpleGeometry(GearGeometry):
 		b = epi_hypo_gear(B, B, 1-b, N)
 		return a, b >> rotor(2 * np.pi / B * ((B+1)%2) / 2)
 
+	@property
+	def symmetries(self):
+		return [{'a': self.geometry['A']}, {'b': self.geometry['B']}]
+
+	@property
+	def meshes(self):
+		return [(0, 1)]
+
+	@property
+	def load_paths(self):
+		return [[(1, 0) if self.kinematics.output == 'a' else (0, 1)]]
+
 	def arrange(self, phase):
+		from pygeartrain.core.pga import translator, rotor
 		a, b = self.generate_profiles
 		A = self.geometry['A']
 		B = self.geometry['B']
@@ -31,10 +46,9 @@ class SimpleGeometry(GearGeometry):
 		mb = translator(+B, 0) * rotor(r['b'])
 		return a >> ma, b >> mb
 
-	def _plot(self, phase, ax):
-		a, b = self.arrange(phase)
-		a.plot(ax=ax, color='r')
-		b.plot(ax=ax, color='b')
+	@property
+	def colors(self):
+		return ['r', 'b']
 
 
 
@@ -47,22 +61,40 @@ class NestedGeometry(GearGeometry):
 
 	@cached_property
 	def generate_profiles(self, b=0.6, res=100):
+		from pygeartrain.core.profiles import epi_hypo_gear
 		N = self.geometry['N']
 
 		a = epi_hypo_gear(N, N, b, res)
 		b = epi_hypo_gear(N+1, N+1, b, res)
 		return a, b
 
+	@property
+	def symmetries(self):
+		N = self.geometry['N']
+		return [{'a': N}, {'b': N + 1}]
+
+	@property
+	def meshes(self):
+		return [(0, 1)]
+
+	@property
+	def load_paths(self):
+		return [[(1, 0) if self.kinematics.output == 'a' else (0, 1)]]
+
+	@property
+	def internal(self):
+		return (1,)
+
 	def arrange(self, phase):
+		from pygeartrain.core.pga import translator, rotor
 		a, b = self.generate_profiles
 		r = self.phases(phase)
 		ma = translator(1, 0) * rotor(r['a'])
 		mb = translator(0, 0) * rotor(r['b'])
 		return a >> ma, b >> mb
 
-	def _plot(self, phase, ax):
-		a, b = self.arrange(phase)
-		a.plot(ax=ax, color='r')
-		b.plot(ax=ax, color='b')
+	@property
+	def colors(self):
+		return ['r', 'b']
 
 
@@ -0,0 +1,105 @@
+"""Precomputed table of all assemblable single stage planetaries
+
+The table is generated once, up to a tooth count limit, and stored as a directory of .npy files:
+the rows themselves, and for each drive configuration the sorted ratios with their row index.
+All files are opened memory-mapped, so that range queries on ratio are binary searches,
+without loading the table, and without any symbolic math.
+"""
+import itertools
+import os
+
+import numpy as np
+
+from pygeartrain.core import assembly
+
+
+# all (input, output, fixed) choices of ring, sun and carrier
+configs = [''.join(c) for c in itertools.permutations('rsc', 3)]
+
+
+def generate(path, limit, planets=None, b=0.5, clearance=0.0):
+    """Generate the table of all assemblable planetaries with up to `limit` ring teeth
+
+    Parameters
+    ----------
+    path: str
+        directory to write the table into
+    limit: int
+        maximum number of ring teeth
+    planets: sequence of int, optional
+        planet counts to consider; by default all that can possibly fit
+    b: float
+        epi/hypo profile ratio, which determines planet tip radius for neighbour clearance
+    clearance: float
+        additional required gap between neighbouring planet tips, relative to carrier radius
+    """
+    from pygeartrain.planetary import Planetary
+
+    stages = assembly.planetary_stages(limit)
+    N = np.arange(1, limit + 1) if planets is None else np.asarray(planets)
+    R, P, S = stages.T[..., None]
+    valid = assembly.equal_spacing(R, S, N) & assembly.planet_clearance(P, S, N, b, clearance)
+    i, j = np.nonzero(valid)
+
+    dtype = [('R', np.int32), ('P', np.int32), ('S', np.int32), ('N', np.int32)] + [(c, float) for c in configs]
+    table = np.empty(len(i), dtype=dtype)
+    for k, g in zip('RPS', stages[i].T):
+        table[k] = g
+    table['N'] = N[j]
+    geometry = dict(R=table['R'], P=table['P'], S=table['S'])
+    for c in configs:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            table[c] = Planetary(*c).evaluate(**geometry)[c[0]]
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, 'table.npy'), table)
+    for c in configs:
+        index = np.argsort(table[c], kind='stable')
+        np.save(os.path.join(path, f'{c}_ratio.npy'), table[c][index])
+        np.save(os.path.join(path, f'{c}_index.npy'), index.astype(np.int64))
+    return PlanetaryTable(path)
+
+
+class PlanetaryTable:
+    """Memory-mapped view of a generated planetary table"""
+
+    def __init__(self, path):
+        self.path = path
+        self.table = np.load(os.path.join(path, 'table.npy'), mmap_mode='r')
+        self._sorted = {}
+
+    def __len__(self):
+        return len(self.table)
+
+    def _index(self, config):
+        if config not in self._sorted:
+            load = lambda s: np.load(os.path.join(self.path, f'{config}_{s}.npy'), mmap_mode='r')
+            self._sorted[config] = load('ratio'), load('index')
+        return self._sorted[config]
+
+    def query(self, config, lo, hi, min_planets=1, max_planets=None):
+        """All planetaries with a ratio in [lo, hi] for the given configuration
+
+        Parameters
+        ----------
+        config: str or tuple
+            (input, output, fixed) members, for instance 'scr' for sun-driven with fixed ring
+        lo, hi: float
+            inclusive bounds on the signed input/output ratio
+        min_planets, max_planets: int, optional
+            bounds on the number of planets
+
+        Returns
+        -------
+        ndarray, structured
+            matching rows, in ascending order of ratio
+        """
+        config = ''.join(config)
+        ratio, index = self._index(config)
+        start = np.searchsorted(ratio, lo, side='left')
+        stop = np.searchsorted(ratio, hi, side='right')
+        rows = self.table[index[start:stop]]
+        mask = rows['N'] >= min_planets
+        if max_planets is not None:
+            mask &= rows['N'] <= max_planets
+        return rows[mask]
@@ -0,0 +1,13 @@
+import pytest
+
+
+@pytest.fixture(autouse=True, scope='session')
+def disk_cache_directory(tmp_path_factory):
+	"""Keep the disk cache of the test session out of the user cache directory, starting empty;
+	through the environment as well, for worker processes importing the cache afresh"""
+	from pygeartrain.core.cache import disk_cache
+	directory = str(tmp_path_factory.mktemp('cache'))
+	with pytest.MonkeyPatch.context() as m:
+		m.setenv('PYGEARTRAIN_CACHE_DIR', directory)
+		m.setattr(disk_cache, 'directory', directory)
+		yield directory
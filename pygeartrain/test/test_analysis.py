@@ -0,0 +1,97 @@
+import numpy as np
+
+from pygeartrain.analysis import SignedDistance, backlash, clearance, member_motions
+from pygeartrain.core.geometry import flatten
+from pygeartrain.core.pga import transform_batch
+from pygeartrain.planetary import Planetary, PlanetaryGeometry
+from pygeartrain.simple import SimpleGear, SimpleGeometry
+
+
+def test_member_motions():
+	gear = PlanetaryGeometry.create(Planetary('s', 'c', 'r'), (14, 4, 6), 5, b=0.8)
+	phases = np.linspace(0, gear.period, 9)
+	motions = member_motions(gear, phases)
+	reference = flatten(gear.arrange(0.0))
+	for m, r, s in zip(motions, reference, gear.arrange_sweep(phases)):
+		if m is not None:
+			assert np.allclose(transform_batch(m, r.vertices), s)
+
+
+def test_clearance():
+	gear = SimpleGeometry(SimpleGear('a', 'b'), {'A': 4, 'B': 5})
+	phases = np.linspace(0, gear.period, 100, endpoint=False)
+	# conjugate profiles touch, but do not interfere
+	c, = clearance(gear, phases)
+	assert (c.a, c.b) == (0, 1)
+	assert c.gap.shape == phases.shape
+	assert abs(c.clearance) < 1e-2
+
+	# shrinking or growing a gear opens up clearance or causes interference
+	a, b = gear.generate_profiles
+	for scale, sign in [(0.97, 1), (1.03, -1)]:
+		gear.__dict__['generate_profiles'] = a.scale(scale), b
+		c, = clearance(gear, phases)
+		assert sign * c.clearance > 0.01
+		assert c.penetration == max(0, -c.clearance)
+
+
+def test_clearance_sweep(monkeypatch):
+	gear = PlanetaryGeometry.create(Planetary('s', 'c', 'r'), (14, 4, 6), 5, b=0.8)
+	phases = np.linspace(0, gear.period, 2000)
+	members = flatten(gear.arrange(0.0))
+	n = sum(len(members[i].vertices) + len(members[j].vertices) for i, j in gear.meshes)
+
+	# only a small fraction of the vertex-phase pairs is resolved exactly against the boundary
+	count = [0]
+	call = SignedDistance.__call__
+	def counted(self, points):
+		count[0] += len(points)
+		return call(self, points)
+	monkeypatch.setattr(SignedDistance, '__call__', counted)
+	results = clearance(gear, phases)
+	monkeypatch.undo()
+	assert count[0] < 0.05 * n * len(phases)
+
+	# the sweep agrees with a brute force evaluation of all vertices, wherever the gap is within the cutoff
+	cutoff = 0.05 * gear.limit
+	motions = member_motions(gear, phases)
+	for c in results:
+		(a, b), fields = (c.a, c.b), {}
+		for t in range(0, len(phases), 97):
+			gap = np.inf
+			for i, j in [(a, b), (b, a)]:
+				f = fields.setdefault(j, SignedDistance(members[j], internal=j in gear.internal))
+				m = motions[i][t] @ np.linalg.inv(motions[j][t])
+				gap = min(gap, f(transform_batch(m, members[i].vertices)).min())
+			if gap < cutoff:
+				assert np.isclose(c.gap[t], gap, rtol=0, atol=1e-9)
+			else:
+				assert c.gap[t] >= cutoff
+
+
+def test_backlash():
+	from pygeartrain.core.pga import rotor, translator
+	gear = SimpleGeometry(SimpleGear('a', 'b'), {'A': 4, 'B': 5})
+	phases = np.linspace(0, gear.period, 24, endpoint=False)
+	# conjugate profiles mesh without play
+	r = backlash(gear, phases)
+	assert np.nanmin(np.abs(r.forward)) < 1e-3
+
+	# a shrunken gear leaves play, which closes once the output turns by it
+	a, b = gear.generate_profiles
+	gear.__dict__['generate_profiles'] = a.scale(0.97), b
+	r = backlash(gear, phases)
+	assert r.meshes == [(0, 1)]
+	assert r.forward.shape == r.reverse.shape == phases.shape
+	assert np.all(r.backlash > 0)
+	assert r.transmission_error is r.reverse
+	t = int(np.argmin(r.forward))
+	pa, pb = flatten(gear.arrange(phases[t]))
+	for scale, sign in [(0.9, 1), (1.1, -1)]:
+		turned = pb >> (translator(5, 0) * rotor(r.forward[t] * scale) * translator(-5, 0))
+		gap = min(SignedDistance(turned)(pa.vertices).min(), SignedDistance(pa)(turned.vertices).min())
+		assert sign * gap > 0
+
+	# interference on both flanks jams the mesh
+	gear.__dict__['generate_profiles'] = a.scale(1.03), b
+	assert np.isnan(backlash(gear, phases).forward).any()
@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+
+from pygeartrain.core.cache import DiskCache, MemoryCache
+
+
+def test_disk_cache(tmp_path):
+	cache = DiskCache(directory=str(tmp_path), max_bytes=10**6)
+	key = cache.key('solve', ['S * s + P * p'], ['c - 1'])
+	assert cache.get(key) is None
+	cache.put(key, {'s': 1})
+	assert cache.get(key) == {'s': 1}
+	assert key != cache.key('solve', ['S * s + P * p'], ['r - 1'])
+
+
+def test_disk_cache_eviction(tmp_path):
+	cache = DiskCache(directory=str(tmp_path), max_bytes=3000)
+	keys = [cache.key(i) for i in range(10)]
+	for i, k in enumerate(keys):
+		cache.put(k, bytes(1000))
+		os.utime(cache._path(k), (i, i))		# deterministic recency ordering
+	assert cache.size <= 3000
+	assert cache.get(keys[-1]) is not None
+	assert cache.get(keys[0]) is None
+
+
+def test_disk_cache_disabled():
+	cache = DiskCache(directory='')
+	cache.put('a', 1)
+	assert cache.get('a') is None
+
+
+def test_memory_cache_eviction():
+	cache = MemoryCache(max_bytes=3000)
+	for i in range(10):
+		cache.put(i, np.zeros(100))		# 800 bytes each
+	assert cache.info().entries == 3
+	assert cache.info().bytes <= 3000
+	assert cache.get(9) is not None
+	assert cache.get(0) is None
+	assert cache.info()[:2] == (1, 1)
+
+
+def test_memory_cache_memoize():
+	cache = MemoryCache(max_bytes=10**6)
+	calls = []
+
+	@cache.memoize
+	def profiles(G, N, b=0.5):
+		calls.append(G)
+		return np.arange(sum(G)) * b, np.zeros(N)
+
+	a = profiles((14, 4, 6), 5)
+	b = profiles((14, 4, 6), 5, b=0.5)
+	assert a is not b and len(calls) == 2		# keyword and default arguments are keyed separately
+	assert profiles((14, 4, 6), 5) is a
+	assert len(calls) == 2
+	assert cache.info().hits == 1
+	# unhashable arguments are evaluated, but not cached
+	assert np.array_equal(profiles([14, 4, 6], 5)[0], a[0])
+	assert len(calls) == 3 and cache.info().entries == 2
+
+
+def test_disk_cache_isolated(disk_cache_directory):
+	from pygeartrain.core.cache import disk_cache
+	# the test session does not read or write the cache of the user
+	assert disk_cache.directory == os.environ['PYGEARTRAIN_CACHE_DIR'] == disk_cache_directory
+	assert disk_cache.directory != os.path.join(os.path.expanduser('~'), '.cache', 'pygeartrain')
@@ -20,10 +20,10 @@ def test_compound_planetary():
 	gear.animate()
 
 
-def test_50():
+def test_50(tmp_path):
 	kinematics = CompoundPlanetary('s1', 'r2', 'r1')
 	gear = CompoundPlanetaryGeometry.create(kinematics, (13, 4, 5), (21, 6, 9), 6, b1=0.33, b2=0.66)
-	gear.plot(filename='252_2.png')
+	gear.plot(filename=tmp_path / '252_2.png')
 	gear.animate(scale=0.0001)
 	gear = CompoundPlanetaryGeometry.create(kinematics, (15, 3, 9), (19, 4, 11), 6, b1=0.6, b2=0.6)
 	gear.animate()
@@ -42,13 +42,13 @@ def test_compound_planetary_carrier():
 	gear.animate()
 
 
-def test_low():
+def test_low(tmp_path):
 	print()
 	# sun-driven
 	kinematics = CompoundPlanetary('s1', 'r2', 'r1')
 	print(kinematics)
 	gear = CompoundPlanetaryGeometry.create(kinematics, (20, 4, 12), (16, 4, 8), 8, b1=0.7, b2=0.3)
-	gear.plot(filename='32_3.png')
+	gear.plot(filename=tmp_path / '32_3.png')
 	gear.animate()
 	gear = CompoundPlanetaryGeometry.create(kinematics, (28, 4, 20), (22, 4, 14), 12, b1=0.65, b2=0.35)
 	gear.animate()
@@ -87,7 +87,7 @@ def test_compound_planetary_high():
 	gear.animate()
 
 
-def test_compound_backdrive():
+def test_compound_backdrive(tmp_path):
 	"""https://ieeexplore.ieee.org/stamp/stamp.jsp?tp=&arnumber=8867893
 	large planets seems to be the key to high efficiency
 	"""
@@ -101,24 +101,24 @@ def test_compound_backdrive():
 
 	gear = CompoundPlanetaryGeometry.create(kinematics, (43, 19, 5), (46, 19, 8), 3, b1=0.5, b2=0.5)
 	print(gear.ratios_f['s1'] / sum(gear.G1+gear.G2))	# this 14 is really extreme; usually its close to 1.
-	gear.plot(filename='736_5.png')
+	gear.plot(filename=tmp_path / '736_5.png')
 	gear.plot(123)
 	# eval_compound_symbolic((5, 19, 43),
 	# 					   (8, 19, 46))  # , 3)  # 147.20000000000002, 8.898223686155035, 0.1111111111111111)
 
 
-def test_readme_animation():
+def test_readme_animation(tmp_path):
 	"""Using this example because it has a managable periodicity"""
 	kinematics = CompoundPlanetary('s1', 'r2', 'r1')
 	print(kinematics)
 	gear = CompoundPlanetaryGeometry.create(kinematics, (5, 2, 1), (4, 1, 2), 3, b1=0.25, b2=0.75)
-	gear.save_animation(frames=100, filename='compound.gif')
+	gear.save_animation(frames=100, filename=tmp_path / 'compound.gif')
 
 
-def test_readme():
+def test_readme(tmp_path):
 	kinematics = CompoundPlanetary('s1', 'r2', 'r1')
 	gear = CompoundPlanetaryGeometry.create(kinematics, (22, 7, 8), (21, 6, 9), 5, b1=0.4, b2=0.6)
-	gear.plot(show=False, filename='compound.png')
+	gear.plot(show=False, filename=tmp_path / 'compound.png')
 
 
 def test_gdfw():
@@ -0,0 +1,85 @@
+import numpy as np
+
+from pygeartrain.core.extrusion import _STL, extrude, filter_close, helix, member_axes, mesh, rim, write_stl
+from pygeartrain.core.geometry import flatten
+from pygeartrain.core.pga import rigid_matrices, transform_batch
+from pygeartrain.core.profiles import Profile
+from pygeartrain.cycloid import Cycloid, CycloidGeometry
+from pygeartrain.planetary import Planetary, PlanetaryGeometry
+
+
+def test_filter_close():
+	square = np.array([[0, 0], [1, 0], [1, 0], [1, 1], [0, 1], [0, 0]], float)
+	p = filter_close(Profile.concat([Profile(square), Profile(square + 2)]), 1e-9)
+	assert len(p.vertices) == 8
+	assert np.array_equal(p.offsets, [0, 4, 8])
+
+
+def test_extrude():
+	z = np.linspace(-1, 1, 5)
+	for gear in [
+		PlanetaryGeometry.create(Planetary('s', 'c', 'r'), (14, 4, 6), 5, b=0.8),
+		CycloidGeometry.create(Cycloid('c', 'p', 'r'), 9, O=4),
+	]:
+		rates, centers = member_axes(gear, 'c')
+		out = extrude(gear, z, 0.3, carrier='c', tolerance=0)
+		k = int(np.flatnonzero(rates)[0])
+		radius = np.linalg.norm(flatten(gear.arrange(0.0))[k].vertices - centers[k], axis=1).max()
+		for t, phase in enumerate(helix(z, 0.3, radius) / rates[k]):
+			# every slice shows the planar arrangement at some phase, seen from the carrier
+			inverse = rigid_matrices(-gear.ratios_f['c'] * phase)
+			for m, s in zip(flatten(gear.arrange(phase)), out):
+				if s is not None:
+					assert np.allclose(transform_batch(inverse, filter_close(m, 0).vertices), s.vertices[t, :, :2])
+					assert np.all(s.vertices[t, :, 2] == z[t])
+
+	# herringbone slices mirror about the mid-plane; centered members turn about the origin
+	out = extrude(gear, z, 0.3, carrier='c', herringbone=True, centered=True)
+	assert np.allclose(out[1].vertices[0, :, :2], out[1].vertices[-1, :, :2])
+	r = np.linalg.norm(out[1].vertices[..., :2], axis=-1)
+	assert np.allclose(r, r[2])
+
+
+def watertight(vertices, faces):
+	"""Every directed edge occurs once, and its reverse once; closed, and consistently oriented"""
+	e = np.stack([faces.ravel(), np.roll(faces, -1, axis=1).ravel()], axis=1)
+	key, reverse = e[:, 0] * len(vertices) + e[:, 1], e[:, 1] * len(vertices) + e[:, 0]
+	return len(np.unique(key)) == len(key) and np.isin(reverse, key).all()
+
+
+def volume(vertices, faces):
+	a, b, c = (vertices[faces[:, i]] for i in range(3))
+	return np.einsum('ij,ij->i', a, np.cross(b, c)).sum() / 6
+
+
+def test_mesh(tmp_path):
+	z = np.linspace(-0.2, 0.2, 9)
+	gear = PlanetaryGeometry.create(Planetary('s', 'c', 'r'), (14, 4, 6), 5, b=0.8)
+	out = extrude(gear, z, 0.3, carrier='c', herringbone=True, centered=True)
+	# the ring needs an outer wall; its teeth bound a hole
+	meshes = [mesh(rim(out[0], 2.0)), mesh(out[1])]
+	cycloid = CycloidGeometry.create(Cycloid('c', 'p', 'r'), 9, O=4)
+	# a disc with holes, stacked downwards
+	meshes.append(mesh(extrude(cycloid, z[::-1], 0.3, carrier='c')[1]))
+	for vertices, faces in meshes:
+		assert watertight(vertices, faces)
+		assert volume(vertices, faces) > 0
+
+	# the sliced area times the height; up to the chords of the walls between twisted slices
+	ring = rim(out[0], 2.0).vertices[0, :, :2]
+	split = out[0].offsets[-1]
+	def shoelace(v):
+		w = np.roll(v, -1, axis=0)
+		return abs((v[:, 0] * w[:, 1] - v[:, 1] * w[:, 0]).sum()) / 2
+	area = shoelace(ring[split:]) - shoelace(ring[:split])
+	assert np.isclose(volume(*meshes[0]), area * 0.4, rtol=1e-3)
+
+	filename = tmp_path / 'gears.stl'
+	write_stl(filename, meshes, chunk=1000)
+	data = filename.read_bytes()
+	count = sum(len(f) for _, f in meshes)
+	assert len(data) == 84 + 50 * count
+	assert np.frombuffer(data[80:84], '<u4')[0] == count
+	records = np.frombuffer(data[84:], _STL)
+	vertices, faces = meshes[-1]
+	assert np.allclose(records['vertices'][-len(faces):], vertices[faces], atol=1e-6)
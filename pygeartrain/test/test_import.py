@@ -0,0 +1,46 @@
+"""Guard against import time regressions for kinematics-only use"""
+import subprocess
+import sys
+
+
+heavy = ['sympy', 'numga', 'pycomplex', 'shapely', 'matplotlib', 'scipy']
+modules = [
+	'pygeartrain.planetary', 'pygeartrain.compound_planetary', 'pygeartrain.cycloid',
+	'pygeartrain.compound_cycloid', 'pygeartrain.nabtesco', 'pygeartrain.simple',
+	'pygeartrain.angular_contact', 'pygeartrain.table',
+]
+
+
+def run(code):
+	return subprocess.run(
+		[sys.executable, '-c', code], capture_output=True, text=True, check=True
+	).stdout.split()
+
+
+def test_import_lightweight():
+	"""Importing geartrain definitions should not pull in symbolic math, geometric algebra or plotting"""
+	loaded = run(f'import sys, {", ".join(modules)}; print(*[m for m in {heavy} if m in sys.modules])')
+	assert loaded == []
+
+
+def test_kinematics_lightweight():
+	"""Evaluating ratios should never touch the profile and plotting stack"""
+	code = (
+		'import sys\n'
+		'from pygeartrain.compound_planetary import CompoundPlanetary, CompoundPlanetaryGeometry\n'
+		'k = CompoundPlanetary("s1", "r2", "r1")\n'
+		'g = CompoundPlanetaryGeometry.create(k, (13, 4, 5), (21, 6, 9), 6)\n'
+		'g.ratios_f, g.ratios_exact, g.configurations\n'
+		f'print(*[m for m in {heavy[1:]} if m in sys.modules])'
+	)
+	assert run(code) == []
+
+
+def test_import_time():
+	code = (
+		'import time; t = time.perf_counter()\n'
+		f'import {", ".join(modules)}\n'
+		'print(time.perf_counter() - t)'
+	)
+	# numpy dominates what remains; generous bound to stay robust on slow machines
+	assert float(run(code)[0]) < 1.0
@@ -0,0 +1,91 @@
+from fractions import Fraction
+import numpy as np
+
+from pygeartrain.planetary import Planetary
+from pygeartrain.compound_planetary import CompoundPlanetary
+from pygeartrain.nabtesco import NabtescoKinematics
+
+
+def test_compiled():
+	kinematics = CompoundPlanetary('s1', 'r2', 'r1')
+	G1 = np.array([[13, 4, 5], [55, 21, 13]])
+	G2 = np.array([[21, 6, 9], [42, 16, 10]])
+	geometry = {**dict(zip(['R1', 'P1', 'S1'], G1.T)), **dict(zip(['R2', 'P2', 'S2'], G2.T))}
+	ratios = kinematics.evaluate(**geometry)
+	assert ratios['s1'].shape == (2,)
+	assert np.allclose(ratios['r2'], 1)
+	assert np.allclose(ratios['r1'], 0)
+	for i in range(2):
+		reference = {k: float(r.subs({k: v[i] for k, v in geometry.items()})) for k, r in kinematics.solve.items()}
+		for k, r in reference.items():
+			assert np.isclose(ratios[k][i], r)
+
+
+def test_compiled_broadcast():
+	kinematics = Planetary('s', 'c', 'r')
+	S = np.arange(1, 20)
+	ratios = kinematics.evaluate(R=S[:, None] + 2 * S, P=S, S=S[:, None])
+	assert ratios['s'].shape == (19, 19)
+	assert np.allclose(ratios['c'], 1)
+	# compiled functions are shared between instances of the same topology
+	assert Planetary('s', 'c', 'r').compiled is kinematics.compiled
+
+
+def test_pickle():
+	import pickle
+	from pygeartrain.planetary import PlanetaryGeometry
+	gear = PlanetaryGeometry.create(Planetary('s', 'c', 'r'), (14, 4, 6), 5, b=0.8)
+	ratios, period = gear.ratios_f, gear.period_exact
+	# compiled ratios and equations stay out of the instance, which can be sent to worker processes
+	copy = pickle.loads(pickle.dumps(gear))
+	assert copy.ratios_f == ratios and copy.period_exact == period
+	assert copy.kinematics.compiled is gear.kinematics.compiled
+
+
+def test_compiled_nabtesco():
+	kinematics = NabtescoKinematics('s', 'o', 'r')
+	ratios = kinematics.evaluate(L=15, S=8, W=19)
+	assert np.isclose(ratios['s'], float(kinematics.ratio.subs({'L': 15, 'S': 8, 'W': 19})))
+
+
+def test_exact():
+	kinematics = CompoundPlanetary('s1', 'r2', 'r1')
+	geometry = dict(R1=13, P1=4, S1=5, R2=21, P2=6, S2=9)
+	ratios = kinematics.solve_exact(**geometry)
+	assert ratios['s1'] == Fraction(252, 5)
+	assert ratios['r2'] == 1
+	for k, r in kinematics.solve.items():
+		assert r.subs(geometry) == ratios[k]
+
+
+def test_exact_batch():
+	kinematics = CompoundPlanetary('s1', 'r2', 'r1')
+	G1 = np.array([[13, 4, 5], [55, 21, 13], [11, 2, 7]])
+	G2 = np.array([[21, 6, 9], [42, 16, 10], [8, 2, 4]])
+	geometry = {**dict(zip(['R1', 'P1', 'S1'], G1.T)), **dict(zip(['R2', 'P2', 'S2'], G2.T))}
+	ratios = kinematics.solve_batch(**geometry)
+	num, den = ratios['s1']
+	assert num[0] == 252 and den[0] == 5
+	for i in range(3):
+		exact = kinematics.solve_exact(**{k: int(v[i]) for k, v in geometry.items()})
+		for k, (n, d) in ratios.items():
+			assert exact[k].numerator == n[i] and exact[k].denominator == d[i]
+
+
+def test_configurations():
+	geometry = dict(R1=np.array([13, 55]), P1=np.array([4, 21]), S1=np.array([5, 13]),
+					R2=np.array([21, 42]), P2=np.array([6, 16]), S2=np.array([9, 10]))
+	configs, ratios = CompoundPlanetary.evaluate_configurations(**geometry)
+	assert ratios.shape == (len(configs), 2)
+	for config in [('s1', 'r2', 'r1'), ('c', 'r2', 'r1'), ('s1', 'r1', 's2')]:
+		expected = CompoundPlanetary(*config).evaluate(**geometry)[config[0]]
+		assert np.allclose(ratios[configs.index(config)], expected)
+
+
+def test_configurations_nabtesco():
+	kinematics = NabtescoKinematics('s', 'o', 'r')
+	configs, ratios = NabtescoKinematics.evaluate_configurations(L=15, S=8, W=19)
+	ratios = dict(zip(configs, ratios))
+	assert np.isclose(ratios[('s', 'o', 'r')], float(kinematics.solve_exact(L=15, S=8, W=19)['s']))
+	# lobed wheel and output carrier are rigidly connected; fixing one does not leave the other free
+	assert np.isnan(ratios[('s', 'o', 'l')])
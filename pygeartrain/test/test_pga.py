@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from pygeartrain.core.pga import rigid_matrices, transform_batch
+
+
+def test_rigid_matrices():
+	p = np.random.default_rng(0).normal(size=(7, 2))
+	a, t = np.linspace(0, 3, 5), np.arange(10).reshape(5, 2)
+	q = transform_batch(rigid_matrices(a, t[:, 0], t[:, 1]), p)
+	assert q.shape == (5, 7, 2)
+	for i in range(5):
+		c, s = np.cos(a[i]), np.sin(a[i])
+		assert np.allclose(q[i], p @ np.array([[c, s], [-s, c]]) + t[i])
+
+
+def test_batch_matches_motors():
+	from pygeartrain.core.pga import rotor, translator, transform, as_matrices
+	p = np.random.default_rng(0).normal(size=(7, 2))
+	motors = [translator(i, -i) * rotor(i / 3) for i in range(4)]
+	q = transform_batch(as_matrices(motors), p)
+	for m, qi in zip(motors, q):
+		assert np.allclose(transform(m, p), qi)
+	assert np.allclose(as_matrices(motors), rigid_matrices(np.arange(4) / 3, np.arange(4), -np.arange(4)))
+
+
+def test_rigid_composition():
+	from pygeartrain.core.pga import Rigid, rotor, translator
+	p = np.random.default_rng(0).normal(size=(7, 2))
+	a = translator(1, 2) * rotor(0.3)
+	b = translator(-0.5, 0.1) * rotor(-1.2)
+	# products compose, applying the right operand first
+	assert np.allclose((a * b)(p), a(b(p)))
+	# conjugation; b expressed relative to the frame of a
+	assert np.allclose((a >> b)(p), a(b(a.reverse()(p))))
+	assert np.allclose((a * a.reverse())(p), p)
+	# carrier placement, as used in planetary arrange
+	assert np.allclose((rotor(np.pi / 2) >> translator(1, 0))(np.zeros((1, 2))), [[0, 1]])
+	# batched motions
+	batch = Rigid(np.linspace(0, 1, 3), np.arange(3.), 1.0)
+	q = (a * batch)(p)
+	assert q.shape == (3, 7, 2)
+	assert np.allclose(q[1], a(Rigid(0.5, 1.0, 1.0)(p)))
+
+
+def test_rigid_numga_interop():
+	pytest.importorskip('numga')
+	from pygeartrain.core.pga import Rigid, transform
+	a = Rigid(0.3, 1, 2)
+	m = a.to_motor()
+	p = np.random.default_rng(0).normal(size=(7, 2))
+	assert np.allclose(transform(m, p), a(p))
+	assert np.allclose((Rigid(-0.1, 0, 1) * m)(p), Rigid(-0.1, 0, 1)(a(p)))
+	b = Rigid.from_motor(m)
+	assert np.allclose([b.angle, b.tx, b.ty], [0.3, 1, 2])
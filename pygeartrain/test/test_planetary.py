@@ -14,3 +14,11 @@ def test_planetary():
 	gear = PlanetaryGeometry.create(kinematics, (11, 2, 7), 6, b=0.6)
 	print(gear)
 	gear.animate()
+
+
+def test_planetary_list():
+	# tooth counts given as a list produce, and share, the same cached profiles as a tuple
+	kinematics = Planetary('s', 'c', 'r')
+	a = PlanetaryGeometry.create(kinematics, [14, 4, 6], 5).generate_profiles
+	b = PlanetaryGeometry.create(kinematics, (14, 4, 6), 5).generate_profiles
+	assert all(p is q for p, q in zip(a[:3], b[:3]))
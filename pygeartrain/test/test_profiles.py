@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from pygeartrain.core.cache import profile_cache
+from pygeartrain.core.profiles import Profile, circle, epi_hypo_gear, rotation, trochoid_part, adaptive_parameters
+
+
+def _chord_error(poly, dense):
+	"""Largest distance from dense curve points to the nearest polyline segment"""
+	a, d = poly[:-1], np.diff(poly, axis=0)
+	t = np.einsum('pki,ki->pk', dense[:, None] - a, d) / np.einsum('ki,ki->k', d, d)
+	q = a + np.clip(t, 0, 1)[..., None] * d
+	return np.linalg.norm(dense[:, None] - q, axis=-1).min(axis=1).max()
+
+
+def test_adaptive_parameters_circle():
+	circle = lambda t: np.array([np.cos(t), np.sin(t)]).T
+	t = adaptive_parameters(circle, 0, 2 * np.pi, 1e-3)
+	# constant curvature gives uniform spacing
+	assert np.allclose(np.diff(t), np.diff(t)[0])
+	assert len(t) - 1 == int(np.ceil(2 * np.pi / np.sqrt(8e-3)))
+
+
+def test_trochoid_tolerance():
+	R, N, f = 10 / 3, 20, 0.5
+	dense = trochoid_part(R, R / N * f, +1, res=200000, endpoint=True)
+	uniform = trochoid_part(R, R / N * f, +1, res=500, endpoint=True)
+	adaptive = trochoid_part(R, R / N * f, +1, res=500, endpoint=True, tolerance=_chord_error(uniform, dense))
+	assert len(adaptive) < len(uniform)
+	assert _chord_error(adaptive, dense) < 1.5 * _chord_error(uniform, dense)
+
+
+def test_profile_concat():
+	square = Profile.from_points([[0, 0], [1, 0], [1, 1], [0, 1]])
+	p = Profile.concat([square, Profile.empty(), circle(0.5, N=10).translate([3, 0])])
+	assert p.offsets.tolist() == [0, 4, 14]
+	assert len(p.loops) == 2
+	assert p.edges[:4].tolist() == [[3, 0], [0, 1], [1, 2], [2, 3]]
+	assert p.edges[4].tolist() == [13, 4]
+	closed = p.closed()
+	# each non-empty loop is closed and terminated by a separator
+	assert closed.shape == (14 + 2 * 2, 2)
+	assert np.array_equal(closed[4], closed[0])
+	assert np.isnan(closed[5]).all() and np.isnan(closed[-1]).all()
+	assert np.isclose(p.limit, 3.5)
+
+
+def test_profile_float32():
+	p = circle(1.0).astype(np.float32)
+	assert p.scale(2).vertices.dtype == np.float32
+	assert p.transform(np.eye(2)).vertices.dtype == np.float32
+	assert Profile.concat([p, p]).vertices.dtype == np.float32
+
+
+def test_profile_complex_roundtrip():
+	p = Profile.concat([circle(1.0, N=5), circle(2.0, N=7)])
+	# duck-typed stand-in for the pycomplex type
+	complex = SimpleNamespace(vertices=p.vertices, topology=SimpleNamespace(elements=[None, p.edges]))
+	q = Profile.from_complex(complex)
+	assert q.offsets.tolist() == p.offsets.tolist()
+	# reversed cube order takes the general path
+	complex.topology.elements[-1] = p.edges[::-1]
+	q = Profile.from_complex(complex)
+	assert sorted(np.diff(q.offsets).tolist()) == [5, 7]
+	assert np.array_equal(np.sort(q.edges.ravel()), np.sort(p.edges.ravel()))
+
+
+def test_epi_hypo_gear():
+	R, N, f, res = 14 / 10, 14, 0.8, 50
+	# reference construction, rotating the tooth into position one at a time
+	r, t = R / N, 2 * np.pi / N
+	p = np.dot(trochoid_part(R, r * f, +1, res=res), rotation(-t * f / 2))
+	n = np.dot(trochoid_part(R, r * (1 - f), -1, res=res), rotation(t * f / 2))
+	u = np.concatenate([p, n], axis=0)
+	reference = np.concatenate([np.dot(u, rotation(t * i)) for i in range(N)], axis=0)
+
+	profile_cache.clear()
+	gear = epi_hypo_gear(R, N, f, res)
+	assert np.allclose(gear.vertices, reference, rtol=0, atol=1e-12)
+	# cached profiles are shared, so they can not be modified in place
+	assert epi_hypo_gear(R, N, f, res) is gear
+	assert profile_cache.info().hits == 1
+	assert not gear.vertices.flags.writeable
@@ -0,0 +1,74 @@
+import numpy as np
+
+from pygeartrain.core.animation import render_frames
+from pygeartrain.core.geometry import flatten
+from pygeartrain.core.raster import Rasterizer, fill_mask, line_coverage
+from pygeartrain.test.test_sweep import geometries
+
+
+def test_fill_mask():
+	square = np.array([[2, 2], [12, 2], [12, 8], [2, 8]], float)
+	a, b = square, np.roll(square, -1, axis=0)
+	mask = fill_mask(a, b, (10, 16))
+	assert mask.sum() == 10 * 6
+	assert mask[2:8, 2:12].all()
+	# a hole inside the square, and an overlapping square in its own group
+	hole = np.array([[4, 4], [8, 4], [8, 6], [4, 6]], float)
+	a2, b2 = np.concatenate([a, hole]), np.concatenate([b, np.roll(hole, -1, axis=0)])
+	assert fill_mask(a2, b2, (10, 16)).sum() == 60 - 8
+	group = np.repeat([0, 1], 4)
+	assert fill_mask(a2, b2, (10, 16), group).sum() == 60
+
+
+def test_line_coverage():
+	a, b = np.array([[2.0, 5.5]]), np.array([[12.0, 5.5]])
+	coverage = line_coverage(a, b, (10, 16), linewidth=1.0)
+	assert np.isclose(coverage.sum(), 10)
+	assert np.allclose(coverage[5, 3:11], 1)
+
+
+def test_rasterizer_segments():
+	gear = geometries()[2]
+	r = Rasterizer(gear)
+	_, indices = r.groups[0]
+	previous = None
+	for phase in [0.1, 0.2]:
+		members = flatten(gear.arrange(phase))
+		a, b, group = r.segments(members, indices)
+		# the edges of all members, gathered by their vertex index pairs
+		e = [members[i].vertices[members[i].edges] for i in indices]
+		p = np.concatenate(e) * [r.scale, -r.scale] + [r.shape[1] / 2, r.shape[0] / 2]
+		assert np.allclose(a, p[:, 0]) and np.allclose(b, p[:, 1])
+		assert np.array_equal(group, np.repeat(np.arange(len(e)), [len(x) for x in e]))
+		# written into the same buffers every frame
+		assert previous is None or np.shares_memory(a, previous)
+		previous = a
+
+
+def test_rasterizer():
+	for gear in geometries():
+		image = Rasterizer(gear, size=(64, 48), fill=0.3)(0.1)
+		assert image.shape == (48, 64, 3) and image.dtype == np.uint8
+		assert (image < 255).any()
+
+	gear = geometries()[0]
+	phases = np.linspace(0, 1, 5)
+	serial = list(render_frames(gear, phases, workers=0, renderer='raster'))
+	pooled = list(render_frames(gear, phases, workers=2, batch=2, renderer='raster'))
+	assert all(np.array_equal(s, p) for s, p in zip(serial, pooled))
+
+
+def test_render_frames_spawn(monkeypatch):
+	import multiprocessing
+	from concurrent.futures import ProcessPoolExecutor
+	from functools import partial
+	from pygeartrain.core import animation
+	# workers that do not inherit the parent process, as by default on macOS, Windows, and python 3.14 on linux
+	spawn = partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context('spawn'))
+	monkeypatch.setattr(animation, 'ProcessPoolExecutor', spawn)
+	gear = geometries()[0]
+	gear.ratios_f
+	phases = np.linspace(0, 1, 4)
+	serial = list(render_frames(gear, phases, workers=0, renderer='raster'))
+	pooled = list(render_frames(gear, phases, workers=2, batch=2, renderer='raster'))
+	assert all(np.array_equal(s, p) for s, p in zip(serial, pooled))
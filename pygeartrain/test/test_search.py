@@ -0,0 +1,29 @@
+import numpy as np
+
+from pygeartrain.compound_planetary import CompoundPlanetary
+from pygeartrain.core import assembly
+from pygeartrain.search import search
+
+
+def test_search():
+	kinematics = CompoundPlanetary('s1', 'r2', 'r1')
+	candidates = search(30, kinematics, k=50, processes=1)
+	assert len(candidates) == 50
+	scores = [c.score for c in candidates]
+	assert scores == sorted(scores, reverse=True)
+	for c in candidates:
+		(R1, P1, S1), (R2, P2, S2) = c.G1, c.G2
+		assert max(c.G1 + c.G2) <= 30
+		assert assembly.meshing(R1, P1, S1) and assembly.meshing(R2, P2, S2)
+		assert assembly.equal_spacing(R1, S1, c.N) and assembly.equal_spacing(R2, S2, c.N)
+		gear = c.create(kinematics)
+		assert np.isclose(float(gear.ratios_exact['s1']), c.ratio)
+		assert np.isclose(c.score, abs(c.ratio) / sum(c.G1 + c.G2))
+
+
+def test_search_identical():
+	candidates = search(31, planets=[13], k=100, identical=True, max_module_ratio=1.5, processes=1)
+	# known design with all-identical planets
+	assert any(c.G1 == (30, 4, 22) and c.G2 == (31, 5, 21) for c in candidates)
+	# sharding over processes gives identical results
+	assert search(31, planets=[13], k=100, identical=True, max_module_ratio=1.5, processes=2) == candidates
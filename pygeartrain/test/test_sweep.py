@@ -0,0 +1,134 @@
+from fractions import Fraction
+
+import numpy as np
+
+from pygeartrain.core.geometry import flatten
+from pygeartrain.planetary import Planetary, PlanetaryGeometry
+from pygeartrain.compound_planetary import CompoundPlanetary, CompoundPlanetaryGeometry
+from pygeartrain.cycloid import Cycloid, CycloidGeometry
+from pygeartrain.compound_cycloid import CompoundCycloid, CompoundCycloidGeometry
+from pygeartrain.nabtesco import NabtescoKinematics, NabtescoGeometry
+from pygeartrain.simple import SimpleGear, SimpleGeometry, NestedGear, NestedGeometry
+
+
+def geometries():
+	return [
+		PlanetaryGeometry.create(Planetary('s', 'c', 'r'), (14, 4, 6), 5, b=0.8),
+		CompoundPlanetaryGeometry.create(CompoundPlanetary('r1', 'r2', 's1'), (15, 4, 7), (18, 5, 8), 3),
+		CycloidGeometry.create(Cycloid('c', 'p', 'r'), 9, O=4),
+		CompoundCycloidGeometry.create(CompoundCycloid('c', 'r2', 'r1'), P1=8, P2=7, b=1.2, f=0.5),
+		NabtescoGeometry.create(NabtescoKinematics('s', 'o', 'r'), L=15, S=8, W=19, b=1.5, f=0.8),
+		SimpleGeometry(SimpleGear('a', 'b'), {'A': 4, 'B': 5}),
+		NestedGeometry(NestedGear('a', 'b'), {'N': 4}),
+	]
+
+
+def test_arrange_sweep():
+	phases = np.linspace(0, 1, 7)
+	for gear in geometries():
+		sweep = gear.arrange_sweep(phases)
+		for t, phase in enumerate(phases):
+			members = flatten(gear.arrange(phase))
+			assert len(members) == len(sweep)
+			for m, s in zip(members, sweep):
+				assert s.shape == (len(phases),) + m.vertices.shape
+				assert np.allclose(s[t], m.vertices)
+
+
+def test_sweep_chunks():
+	gear = geometries()[0]
+	phases = np.linspace(0, 1, 50)
+	full = gear.arrange_sweep(phases)
+	per_phase = sum(f[0].nbytes for f in full)
+	# buffers are reused between chunks, so copy them out
+	chunks = [[a.copy() for a in c] for s, c in gear.sweep_chunks(phases, max_bytes=per_phase * 2 * 8)]
+	assert len(chunks) == 7
+	for i, f in enumerate(full):
+		assert np.allclose(np.concatenate([c[i] for c in chunks]), f)
+
+
+def test_period():
+	from scipy.spatial import cKDTree
+	points = lambda gear, phase: np.concatenate([m.vertices for m in flatten(gear.arrange(phase))])
+	for gear in geometries():
+		tree = cKDTree(points(gear, 0.3))
+		mismatch = lambda phase: tree.query(points(gear, phase))[0].max()
+		T = gear.period
+		assert T > 0
+		# identical after one period, up to vertex sampling; but not after any fraction of it
+		assert mismatch(0.3 + T) < 0.02
+		assert min(mismatch(0.3 + T / k) for k in range(2, 8)) > 0.1
+	assert geometries()[0].period_exact == Fraction(1, 5)
+
+
+def test_periodic_sweep():
+	gear = geometries()[0]
+	phases = np.linspace(0, 3 * gear.period, 12, endpoint=False)
+	full = gear.arrange_sweep(phases)
+	periodic = gear.arrange_sweep(phases, periodic=True)
+	for f, p in zip(full, periodic):
+		assert np.allclose(p[:4], f[:4])
+		assert np.allclose(p[4:], np.concatenate([f[:4], f[:4]]))
+
+
+def test_lines():
+	import matplotlib.pyplot as plt
+	for gear in geometries():
+		fig, ax = plt.subplots()
+		lines, update = gear._lines(ax)
+		assert update(0.3) is lines
+		drawn = [m for m, c in zip(flatten(gear.arrange(0.3)), gear.colors) if c is not None]
+		assert len(lines) == len(drawn)
+		for l, m in zip(lines, drawn):
+			assert np.allclose(l.get_xydata(), m.closed(), equal_nan=True)
+		plt.close('all')
+
+
+def test_plot_collections():
+	import matplotlib.pyplot as plt
+	for gear in geometries():
+		fig, ax = plt.subplots()
+		collections = gear._plot(phase=0.3, ax=ax)
+		colors = [c for c in gear.colors if c is not None]
+		assert len(collections) == len(set(colors)) == len(ax.collections)
+		members = [m for m, c in zip(flatten(gear.arrange(0.3)), gear.colors) if c is not None]
+		assert sum(len(c.get_segments()) for c in collections) == sum(len(m.vertices) for m in members)
+		plt.close('all')
+	# the number of artists does not grow with the number of planets
+	fig, ax = plt.subplots()
+	gear = CompoundPlanetaryGeometry.create(CompoundPlanetary('s1', 'r2', 'r1'), (42, 4, 34), (43, 5, 33), 19, b1=0.55, b2=0.3)
+	assert len(gear._plot(phase=0, ax=ax)) == 2 and not ax.lines
+	plt.close('all')
+
+
+def test_render_frames():
+	from pygeartrain.core.animation import render_frames
+	gear = geometries()[0]
+	phases = np.linspace(0, 1, 11)
+	serial = list(render_frames(gear, phases, workers=0))
+	pooled = list(render_frames(gear, phases, workers=2, batch=4))
+	assert len(serial) == len(pooled) == len(phases)
+	assert all(np.array_equal(s, p) for s, p in zip(serial, pooled))
+	assert not np.array_equal(serial[0], serial[-1])
+
+
+def test_save_animation_repeats(monkeypatch, tmp_path):
+	from contextlib import contextmanager
+	from pygeartrain.core import animation
+	written, render = [], animation.render_frames
+	@contextmanager
+	def frame_writer(filename, fps):
+		yield type('Writer', (), {'append': lambda self, frame: written.append(np.array(frame))})()
+	def render_frames(geometry, phases, **kwargs):
+		assert len(phases) == 4
+		return render(geometry, phases, **kwargs)
+	monkeypatch.setattr(animation, 'frame_writer', frame_writer)
+	monkeypatch.setattr(animation, 'render_frames', render_frames)
+
+	gear = geometries()[0]
+	# three periods render each distinct frame once, and repeat it from the spool
+	gear.save_animation(12, tmp_path / 'repeats.gif', total=3 * gear.period, renderer='raster')
+	assert len(written) == 12
+	for i in range(4, 12):
+		assert np.array_equal(written[i], written[i % 4])
+	assert not np.array_equal(written[0], written[1])
@@ -0,0 +1,26 @@
+import numpy as np
+
+from pygeartrain.core import assembly
+from pygeartrain.planetary import Planetary
+from pygeartrain.table import generate, PlanetaryTable
+
+
+def test_table(tmp_path):
+	generate(str(tmp_path), limit=40)
+	table = PlanetaryTable(str(tmp_path))
+	assert len(table)
+	rows = table.query('scr', 4.9, 5.1, min_planets=4)
+	assert len(rows)
+	assert np.all(np.diff(rows['scr']) >= 0)
+	kinematics = Planetary('s', 'c', 'r')
+	for row in rows:
+		R, P, S, N = (int(row[k]) for k in 'RPSN')
+		assert N >= 4
+		assert assembly.meshing(R, P, S) and assembly.equal_spacing(R, S, N)
+		assert 4.9 <= float(kinematics.solve_exact(R=R, P=P, S=S)['s']) <= 5.1
+
+	# brute force reference
+	full = table.table
+	ratios = full['csr']
+	reference = np.sort(ratios[(ratios >= -3) & (ratios <= -1) & (full['N'] >= 3)])
+	assert np.allclose(table.query(('c', 's', 'r'), -3, -1, min_planets=3)['csr'], reference)
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from pygeartrain.planetary import Planetary, PlanetaryGeometry
+from pygeartrain.simple import SimpleGear, SimpleGeometry
+from pygeartrain.tolerance import monte_carlo
+
+
+def test_monte_carlo():
+	gear = SimpleGeometry(SimpleGear('a', 'b'), {'A': 4, 'B': 5})
+	# removing material opens up clearance and backlash
+	thin = monte_carlo(gear, samples=2, profile=lambda rng, size: np.full(size, -0.01), phases=12, workers=0)
+	assert np.all(thin.metrics['clearance'] > 0.01)
+	assert np.all(thin.metrics['backlash'] > 0)
+
+	# pooled evaluation reproduces serial evaluation of the same seed
+	serial = monte_carlo(gear, samples=4, profile=0.005, phases=12, backlash=False, workers=0, seed=1)
+	pooled = monte_carlo(gear, samples=4, profile=0.005, phases=12, backlash=False, workers=2, chunk=1, seed=1)
+	assert list(serial.metrics) == ['clearance']
+	assert np.allclose(serial.profile, pooled.profile)
+	assert np.allclose(serial.metrics['clearance'], pooled.metrics['clearance'])
+	assert serial.percentiles()['clearance'].shape == (3,)
+
+
+def test_monte_carlo_spawn(monkeypatch):
+	import multiprocessing
+	from concurrent.futures import ProcessPoolExecutor
+	from functools import partial
+	from pygeartrain import tolerance
+	# workers that do not inherit the parent process, as by default on macOS, Windows, and python 3.14 on linux
+	spawn = partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context('spawn'))
+	monkeypatch.setattr(tolerance, 'ProcessPoolExecutor', spawn)
+	gear = SimpleGeometry(SimpleGear('a', 'b'), {'A': 4, 'B': 5})
+	gear.ratios_f
+	serial = monte_carlo(gear, samples=2, profile=0.005, phases=6, backlash=False, workers=0, seed=1)
+	pooled = monte_carlo(gear, samples=2, profile=0.005, phases=6, backlash=False, workers=2, chunk=1, seed=1)
+	assert np.allclose(serial.metrics['clearance'], pooled.metrics['clearance'])
+
+
+def test_monte_carlo_failure(monkeypatch):
+	from multiprocessing import shared_memory
+	from pygeartrain import tolerance
+	def fail(self, profile, radius):
+		raise ZeroDivisionError('evaluation failed')
+	monkeypatch.setattr(tolerance._Evaluator, '__call__', fail)
+	segments = []
+	class Recorded(shared_memory.SharedMemory):
+		def __init__(self, *args, **kwargs):
+			super().__init__(*args, **kwargs)
+			segments.append(self.name)
+	monkeypatch.setattr(tolerance.shared_memory, 'SharedMemory', Recorded)
+	gear = SimpleGeometry(SimpleGear('a', 'b'), {'A': 4, 'B': 5})
+	# the error of a worker surfaces as is, rather than as a failure to release the shared profiles
+	for workers in [0, 2]:
+		with pytest.raises(ZeroDivisionError, match='evaluation failed'):
+			monte_carlo(gear, samples=2, profile=0.005, phases=4, workers=workers)
+	# and the shared profiles do not outlive the study
+	assert segments
+	for name in segments:
+		with pytest.raises(FileNotFoundError):
+			shared_memory.SharedMemory(name)
+
+
+def test_monte_carlo_radius():
+	gear = PlanetaryGeometry.create(Planetary('s', 'c', 'r'), (14, 4, 6), 5, b=0.8)
+	study = monte_carlo(gear, samples=2, radius=0.01, phases=4, backlash=False, workers=0, seed=0)
+	assert study.radius.shape == (2, gear.N)
+	# planets off their nominal radius interfere with ring or sun
+	assert np.all(study.metrics['clearance'] < 0)
+
+	with pytest.raises(ValueError):
+		monte_carlo(SimpleGeometry(SimpleGear('a', 'b'), {'A': 4, 'B': 5}), samples=1, radius=0.01)
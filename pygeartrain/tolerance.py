@@ -0,0 +1,259 @@
+"""Monte Carlo tolerance analysis
+
+Manufactured parts deviate from their nominal profiles, and planets from their nominal carrier radius.
+Random deviations are drawn up front, from a seeded generator, and the resulting geartrains are evaluated
+by `clearance` and `backlash` in a pool of worker processes. The generated profiles are placed
+in shared memory once, so that tasks only carry the deviations of their samples.
+"""
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from multiprocessing import shared_memory
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+
+from pygeartrain import analysis
+from pygeartrain.core.geometry import GearGeometry, flatten
+from pygeartrain.core.profiles import Profile
+
+
+METRICS = ('clearance', 'backlash', 'backlash_max', 'transmission_error')
+
+
+def draw(distribution, size, rng: np.random.Generator) -> np.ndarray:
+    """Samples of a distribution of deviations
+
+    Parameters
+    ----------
+    distribution: float, frozen scipy.stats distribution, or callable
+        a float is the standard deviation of a zero-mean normal distribution;
+        a callable is invoked as distribution(rng, size)
+    """
+    if distribution is None:
+        return np.zeros(size)
+    if np.isscalar(distribution):
+        return rng.normal(0.0, distribution, size)
+    if hasattr(distribution, 'rvs'):
+        return np.asarray(distribution.rvs(size=size, random_state=rng), dtype=float)
+    return np.asarray(distribution(rng, size), dtype=float)
+
+
+class _Slot(NamedTuple):
+    start: int
+    stop: int
+    offsets: np.ndarray
+    dtype: np.dtype
+
+
+def _layout(profiles, start=0):
+    """Replace every profile in a nested structure of generated profiles by its slot in a single vertex block"""
+    if isinstance(profiles, Profile):
+        n = len(profiles.vertices)
+        return _Slot(start, start + n, profiles.offsets, profiles.vertices.dtype), start + n
+    if isinstance(profiles, (list, tuple)):
+        out = []
+        for p in profiles:
+            p, start = _layout(p, start)
+            out.append(p)
+        return type(profiles)(out), start
+    return profiles, start
+
+
+def _fill(layout, profiles, block):
+    if isinstance(profiles, Profile):
+        block[layout.start:layout.stop] = profiles.vertices
+    elif isinstance(profiles, (list, tuple)):
+        for l, p in zip(layout, profiles):
+            _fill(l, p, block)
+
+
+def _rebuild(layout, block):
+    """Nested structure of profiles, viewing their vertices in the block where possible"""
+    if isinstance(layout, _Slot):
+        return Profile(block[layout.start:layout.stop].astype(layout.dtype, copy=False), layout.offsets)
+    if isinstance(layout, (list, tuple)):
+        return type(layout)(_rebuild(l, block) for l in layout)
+    return layout
+
+
+class _Evaluator:
+    """Evaluation of perturbed samples of a geometry, within a single process"""
+
+    def __init__(self, geometry: GearGeometry, profiles, phases, backlash, cutoff):
+        self.geometry = copy.copy(geometry)
+        self.geometry.__dict__['generate_profiles'] = profiles
+        self.phases = phases
+        self.backlash = backlash
+        self.cutoff = cutoff
+        internal = set(geometry.internal)
+        self.normals = [
+            analysis.vertex_normals(m, i in internal)
+            for i, m in enumerate(flatten(self.geometry.arrange(0.0)))
+        ]
+
+    def __call__(self, profile, radius) -> np.ndarray:
+        """Metrics of each sample
+
+        Parameters
+        ----------
+        profile: ndarray, [n, M]
+            outward normal offset of the profile of each member of the flattened arrangement
+        radius: ndarray, [n, N], optional
+            carrier radius of each planet
+
+        Returns
+        -------
+        ndarray, [n, len(METRICS)]
+        """
+        out = np.full((len(profile), len(METRICS)), np.nan)
+        for k in range(len(profile)):
+            geometry = copy.copy(self.geometry)
+            if radius is not None:
+                geometry.radius = radius[k]
+            members = [
+                m.copy(vertices=m.vertices + n * o)
+                for m, n, o in zip(flatten(geometry.arrange(0.0)), self.normals, profile[k])
+            ]
+            c = analysis.clearance(geometry, self.phases, cutoff=self.cutoff, members=members)
+            out[k, 0] = min(r.clearance for r in c)
+            if self.backlash:
+                b = analysis.backlash(geometry, self.phases, cutoff=self.cutoff, members=members)
+                # a jam anywhere voids the sample; phases without contact in reach are left out
+                finite = np.isfinite(b.backlash)
+                if not np.isnan(b.backlash).any() and finite.any():
+                    p, e = b.backlash[finite], b.transmission_error[finite]
+                    out[k, 1:] = p.min(), p.max(), e.max() - e.min()
+        return out
+
+
+_evaluator: Optional[_Evaluator] = None
+
+
+def _initialize(geometry, name, layout, size, phases, backlash, cutoff):
+    global _evaluator
+    shm = shared_memory.SharedMemory(name=name)
+    profiles = _rebuild(layout, np.ndarray((size, 2), dtype=float, buffer=shm.buf))
+    _evaluator = _Evaluator(geometry, profiles, phases, backlash, cutoff)
+    _evaluator.shm = shm    # keep the views into the block valid
+
+
+def _evaluate(profile, radius):
+    return _evaluator(profile, radius)
+
+
+@dataclass(frozen=True)
+class ToleranceStudy:
+    """Samples of a Monte Carlo tolerance analysis, and the metrics of the resulting geartrains
+
+    Metrics are nan where undefined; the backlash metrics of a sample that jams in particular
+    """
+    profile: np.ndarray                 # outward normal offset of each member profile, [n, M]
+    radius: Optional[np.ndarray]        # carrier radius of each planet, [n, N]; None if not perturbed
+    metrics: Dict[str, np.ndarray]      # value of each metric per sample, [n]
+
+    def percentiles(self, q=(5, 50, 95)) -> Dict[str, np.ndarray]:
+        """Percentiles of each metric, over the samples where it is defined"""
+        return {
+            k: np.nanpercentile(v, q) if np.any(np.isfinite(v)) else np.full(len(q), np.nan)
+            for k, v in self.metrics.items()
+        }
+
+
+def monte_carlo(
+        geometry: GearGeometry,
+        samples=1000,
+        profile=None,
+        radius=None,
+        phases=32,
+        backlash=True,
+        cutoff=None,
+        workers=None,
+        chunk=None,
+        seed=None,
+) -> ToleranceStudy:
+    """Monte Carlo tolerance analysis of a geometry
+
+    Every member of the arrangement is an individual part, with its own deviation;
+    so each planet of a planetary is perturbed independently.
+
+    Parameters
+    ----------
+    samples: int
+    profile: float, frozen scipy.stats distribution, or callable; optional
+        distribution of the outward normal offset of each profile, as by `draw`;
+        positive values add material
+    radius: float, frozen scipy.stats distribution, or callable; optional
+        distribution of the deviation of the carrier radius of each planet;
+        only for geometries with a `radius` field
+    phases: int or ndarray
+        phases to sweep; a number of phases spread evenly over one period
+    backlash: bool
+        also compute the backlash metrics; which takes several times longer than clearance alone
+    cutoff: float, optional
+        as used by `clearance` and `backlash`
+    workers: int, optional
+        number of worker processes; all cpus by default. 0 or 1 evaluates in this process
+    chunk: int, optional
+        number of samples per task
+    seed: optional
+        seed of the random generator, for reproducible studies
+
+    Returns
+    -------
+    ToleranceStudy
+        with metrics
+        clearance: smallest clearance of any mesh over the sweep
+        backlash, backlash_max: smallest and largest backlash of the geartrain over the sweep
+        transmission_error: peak-to-peak transmission error over the sweep
+        the backlash metrics skip phases without contact within reach
+    """
+    if radius is not None and not hasattr(geometry, 'radius'):
+        raise ValueError(f'{type(geometry).__name__} has no carrier radius to perturb')
+    if np.isscalar(phases):
+        period = geometry.period or 2 * np.pi
+        phases = np.linspace(0, period, int(phases), endpoint=False)
+    phases = np.asarray(phases, dtype=float)
+
+    rng = np.random.default_rng(seed)
+    members = len(flatten(geometry.arrange(0.0)))
+    offsets = draw(profile, (samples, members), rng)
+    radii = None
+    if radius is not None:
+        nominal = np.broadcast_to(np.asarray(geometry.radius, dtype=float), (geometry.N,))
+        radii = nominal + draw(radius, (samples, geometry.N), rng)
+
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1:
+        evaluator = _Evaluator(geometry, geometry.generate_profiles, phases, backlash, cutoff)
+        values = evaluator(offsets, radii)
+    else:
+        chunk = chunk or max(1, -(-samples // (workers * 4)))
+        profiles = geometry.generate_profiles
+        layout, size = _layout(profiles)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, size) * 16)
+        block = None
+        try:
+            block = np.ndarray((size, 2), dtype=float, buffer=shm.buf)
+            _fill(layout, profiles, block)
+            args = replace(geometry), shm.name, layout, size, phases, backlash, cutoff
+            with ProcessPoolExecutor(workers, initializer=_initialize, initargs=args) as pool:
+                tasks = [
+                    pool.submit(_evaluate, offsets[i:i + chunk], None if radii is None else radii[i:i + chunk])
+                    for i in range(0, samples, chunk)
+                ]
+                values = np.concatenate([t.result() for t in tasks]) if tasks else np.empty((0, len(METRICS)))
+        finally:
+            # the view must be released before its buffer can be, also when the evaluation raised
+            block = None
+            shm.close()
+            shm.unlink()
+
+    if not backlash:
+        values = values[:, :1]
+    return ToleranceStudy(
+        profile=offsets,
+        radius=radii,
+        metrics={k: values[:, i] for i, k in enumerate(METRICS[:values.shape[1]])},
+    )